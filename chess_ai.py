@@ -4,48 +4,55 @@
 
 """
 
-import pygame
 import random
 
-from chess_ai import *
-
 #Constants
 FPS = 60
 PIECES_DIR = "./chess_ai/visuals/chess_pieces"
 CONFIG_FILE = "./chess_config.yaml"
 
-#Declare GlobalState and Global Colors and Pieces
-env = Environment(CONFIG_FILE, PIECES_DIR)
+def main() -> None:
+    #Search pool workers re-import this script, so pygame and the game only load when main runs
+    import pygame
+
+    from chess_ai import Environment, check_events, draw_all_shapes, draw_all_text
 
-## initialize pygame and create window
-pygame.init()
-pygame.mixer.init()  ## For sound
-screen = pygame.display.set_mode((env.visual.w_width, env.visual.w_height), pygame.RESIZABLE)
-pygame.display.set_caption("Chess")
-clock = pygame.time.Clock()     ## For syncing the FPS
+    #Declare GlobalState and Global Colors and Pieces
+    env = Environment(CONFIG_FILE, PIECES_DIR)
 
-## Game loop
-while env.io.running:
+    ## initialize pygame and create window
+    pygame.init()
+    pygame.mixer.init()  ## For sound
+    screen = pygame.display.set_mode((env.visual.w_width, env.visual.w_height), pygame.RESIZABLE)
+    pygame.display.set_caption("Chess")
+    clock = pygame.time.Clock()     ## For syncing the FPS
 
-    #1 Process input/events
+    ## Game loop
+    while env.io.running:
 
-    # will make the loop run at the same speed all the time
-    clock.tick(FPS)    
+        #1 Process input/events
 
-    # gets all the events which have occured till now and keeps tab of them.
-    for event in pygame.event.get():        
-        check_events(event, env)
+        # will make the loop run at the same speed all the time
+        clock.tick(FPS)    
 
-    ########################
+        # gets all the events which have occured till now and keeps tab of them.
+        for event in pygame.event.get():        
+            check_events(event, env)
 
-    ### Your code comes here
+        ########################
 
-    ########################
-    draw_all_shapes(screen, env)
-    draw_all_text(screen, env)
-    env.execute_next_turn()
+        ### Your code comes here
+
+        ########################
+        draw_all_shapes(screen, env)
+        draw_all_text(screen, env)
+        env.execute_next_turn()
     
-    ## Done after drawing everything to the screen
-    pygame.display.flip()       
+        ## Done after drawing everything to the screen
+        pygame.display.flip()       
+
+    env.close()
+    pygame.quit()
 
-pygame.quit()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -2,15 +2,19 @@
 
     Chess AI Package
 
-"""
-
-from .io.events import check_events
+        The pygame facing names are imported on first use, so chess_logic and the AI can be imported
+        without pygame, ex: by search pool worker processes.
 
-from .visuals.draw_shapes import draw_all_shapes
-from .visuals.draw_text import draw_all_text
-from .visuals.images import load_images
+"""
+import importlib
 
-from .environment import Environment
+_LAZY_NAMES = {
+    "check_events": ".io.events",
+    "draw_all_shapes": ".visuals.draw_shapes",
+    "draw_all_text": ".visuals.draw_text",
+    "load_images": ".visuals.images",
+    "Environment": ".environment"
+}
 
 __all__ = [
     "check_events",
@@ -18,4 +22,11 @@ __all__ = [
     "draw_all_text",
     "load_images",
     "Environment"
-]   
\ No newline at end of file
+]
+
+def __getattr__(name: str):
+    if name in _LAZY_NAMES:
+        value = getattr(importlib.import_module(_LAZY_NAMES[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
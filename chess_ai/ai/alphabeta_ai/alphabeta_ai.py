@@ -0,0 +1,596 @@
+import atexit
+import time
+
+from ..base_ai import BaseAI
+from ..search_stats import SearchStats
+from ..transposition_table import TranspositionTable, TT_EXACT, TT_LOWER, TT_UPPER
+from .parallel_search import ParallelRootSearch, LazySmpSearch
+from ...chess_logic.chess_move_codes import MOVE_CAPTURE, MOVE_PROMOTION_SHIFT, MOVE_PROMOTION_MASK
+
+SCORE_INF = 1000000
+MAX_PLY = 128
+
+#Move ordering bands, winning and even captures before quiet moves before losing captures
+ORDER_GOOD_CAPTURE = 100000
+ORDER_BAD_CAPTURE = -100000
+ORDER_KILLER = 90000
+ORDER_COUNTER = 80000
+
+#Quiet move tables are indexed by the from and to squares of a move code
+BUTTERFLY_MASK = 0xFFFF
+HISTORY_MAX = 60000
+
+#Null move pruning searches depth - 1 - NULL_MOVE_REDUCTION after passing the turn
+NULL_MOVE_REDUCTION = 2
+NULL_MOVE_MIN_DEPTH = 3
+
+#Quiet moves after the first LMR_MIN_MOVES are searched LMR_REDUCTION plies shallower, then again at full depth if they beat alpha
+LMR_MIN_MOVES = 3
+LMR_MIN_DEPTH = 3
+LMR_REDUCTION = 1
+
+#Frontier pruning margins in material units indexed by remaining depth, depths past the end of the list are not pruned
+FUTILITY_MARGINS = [0, 2, 4]
+RAZOR_MARGINS = [0, 3, 5]
+
+#Aspiration window around the previous iteration's score at the root, doubled on every fail and opened fully past the max
+ASPIRATION_WINDOW = 1
+ASPIRATION_MAX_WINDOW = 8
+ASPIRATION_MIN_DEPTH = 3
+
+#Nodes between checks of the time and node budget
+BUDGET_CHECK_NODES = 1024
+
+class AlphaBetaAI(BaseAI):
+    def __init__(self, is_white: bool, max_depth: int = 3, tt_mb: float = 16, time_ms: int = 0, node_limit: int = 0,
+                 null_move: bool = True, lmr: bool = True, futility_margins: list = None, razor_margins: list = None, workers: int = 1,
+                 parallel_mode: str = "ROOT", *args, **kwargs) -> None:
+        super().__init__(is_white, *args, **kwargs)
+        self.max_depth = max_depth
+        self.tt = TranspositionTable(tt_mb) if tt_mb > 0 else None
+        self.nodes = 0
+        self.qnodes = 0
+
+        #Search counters of this process for SearchStats, see reset_counters
+        self.seldepth = 0
+        self.beta_cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.cutoff_nodes = 0
+        self.stats = None
+
+        #Pruning and reductions, switchable for comparing searches
+        self.null_move = null_move
+        self.lmr = lmr
+        self.futility_margins = futility_margins if futility_margins is not None else FUTILITY_MARGINS
+        self.razor_margins = razor_margins if razor_margins is not None else RAZOR_MARGINS
+
+        #Budget per move, 0 is unlimited. max_depth caps iterative deepening either way
+        self.time_ms = time_ms
+        self.node_limit = node_limit
+        self.deadline = None
+        self.budget_active = False
+        self.stopped = False
+
+        #Start time and node count the budget is measured from, moved to the ponder hit when pondering
+        self.search_start = 0.0
+        self.budget_nodes = 0
+
+        #Opponent's expected reply from the last principal variation
+        self.ponder_move = None
+
+        #With workers > 1 a process pool, started on the first search, either splits the root moves (ROOT)
+        #or searches the same root next to this process through a shared transposition table (LAZY_SMP)
+        self.workers = workers
+        self.parallel_mode = parallel_mode
+        self.parallel = None
+        self.smp = None
+
+        #Stop signal shared with the calling process when this AI runs in a pool worker
+        self.stop_event = None
+
+        #Node count of every pool task of the running root search, node_limit is checked against it in pool workers
+        self.shared_nodes = None
+
+        #Principal variation of the last completed iteration, searched first by the next one
+        self.root_pv = []
+
+        #Quiet move ordering: two killer moves per ply, butterfly history per team, counter move per previous move
+        self.killers = [[0, 0] for _ in range(MAX_PLY + 1)]
+        self.history = {True: [0] * (BUTTERFLY_MASK + 1), False: [0] * (BUTTERFLY_MASK + 1)}
+        self.counter_moves = [0] * (BUTTERFLY_MASK + 1)
+
+    def reset_counters(self) -> "AlphaBetaAI":
+        """Zeroes the node, selective depth and beta cutoff counters before a search.
+
+            Returns: Self for chaining
+        """
+        self.nodes = 0
+        self.qnodes = 0
+        self.seldepth = 0
+        self.beta_cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.cutoff_nodes = 0
+        return self
+
+    def new_turn(self) -> "AlphaBetaAI":
+        """Clears the killer and counter moves, which belong to the old position, and halves the history so it favours the new one.
+
+            Returns: Self for chaining
+        """
+        self.killers = [[0, 0] for _ in range(MAX_PLY + 1)]
+        self.counter_moves = [0] * (BUTTERFLY_MASK + 1)
+        for is_white in (True, False):
+            self.history[is_white] = [value >> 1 for value in self.history[is_white]]
+        if self.parallel is not None:
+            self.parallel.new_turn()
+        return self
+
+    def _get_pool_settings(self, env) -> tuple:
+        """Get the settings pool workers build their GlobalChess and AlphaBetaAI from.
+
+            Returns: tuple[ chess settings dict, AI settings dict ]
+        """
+        chess_settings = {
+            "files": env.chess.board.files,
+            "ranks": env.chess.board.ranks,
+            "piece_numbers": env.chess.board.piece_numbers,
+            "piece_scores": env.chess.score.piece_scores,
+            "backend": env.chess.board.backend
+        }
+        ai_settings = {
+            "max_depth": self.max_depth,
+            "tt_mb": self.tt.size_mb if self.tt is not None else 0,
+            "null_move": self.null_move,
+            "lmr": self.lmr,
+            "futility_margins": self.futility_margins,
+            "razor_margins": self.razor_margins
+        }
+        return chess_settings, ai_settings
+
+    def get_parallel(self, env) -> ParallelRootSearch:
+        """Get the process pool of the root-parallel search. It is started with this AI's settings on first use.
+
+            Returns: ParallelRootSearch
+        """
+        if self.parallel is None:
+            self.parallel = ParallelRootSearch(self.workers, *self._get_pool_settings(env))
+            atexit.register(self.close)
+        return self.parallel
+
+    def get_smp(self, env) -> LazySmpSearch:
+        """Get the helper pool of the lazy SMP search. On first use the shared transposition table replaces this AI's own,
+            with workers - 1 helpers so this process is the Nth searcher. Needs tt_mb > 0.
+
+            Returns: LazySmpSearch
+        """
+        if self.smp is None:
+            self.smp = LazySmpSearch(max(self.workers - 1, 1), *self._get_pool_settings(env), self.tt.size_mb)
+            self.smp.tt.age = self.tt.age
+            self.tt = self.smp.tt
+            atexit.register(self.close)
+        return self.smp
+
+    def close(self) -> None:
+        """Shuts down the process pool and frees the shared transposition table. Also registered with atexit when they are started,
+            so an exit that skips the game's shutdown path does not leave a shared memory block behind.
+        """
+        atexit.unregister(self.close)
+        if self.parallel is not None:
+            self.parallel.close()
+            self.parallel = None
+        if self.smp is not None:
+            self.smp.close()
+            self.smp = None
+            self.tt = None
+
+    def update_quiet_tables(self, move: int, position, depth: int, ply: int, prev_move: int) -> None:
+        """Records a quiet move that caused a beta cutoff as a killer, in the history and as the counter to the previous move."""
+        killers = self.killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        self.counter_moves[prev_move & BUTTERFLY_MASK] = move
+        history = self.history[position.whites_turn]
+        history[move & BUTTERFLY_MASK] += depth * depth
+        if history[move & BUTTERFLY_MASK] > HISTORY_MAX:
+            self.history[position.whites_turn] = [value >> 1 for value in history]
+
+    def check_budget(self) -> bool:
+        """Checks for a stop request and the time and node budget every BUDGET_CHECK_NODES nodes and stops the search once either is spent.
+
+            Returns: True if the search should stop.
+        """
+        if self.stopped:
+            return True
+        if self.nodes % BUDGET_CHECK_NODES == 0:
+            shared_spent = False
+            if self.shared_nodes is not None:
+                with self.shared_nodes.get_lock():
+                    self.shared_nodes.value += BUDGET_CHECK_NODES
+                    shared_spent = self.node_limit > 0 and self.shared_nodes.value >= self.node_limit
+            if self.stop_requested or (self.stop_event is not None and self.stop_event.is_set()):
+                self.stopped = True
+            elif shared_spent:
+                #Stop the other tasks too, the budget is for the whole search
+                self.stop_event.set()
+                self.stopped = True
+            elif self.budget_active and not self.pondering and ((self.node_limit > 0 and self.nodes - self.budget_nodes >= self.node_limit)
+                    or (self.deadline is not None and time.perf_counter() >= self.deadline)):
+                self.stopped = True
+        return self.stopped
+
+    def ponder_hit(self) -> None:
+        """Starts the time and node budget of the running ponder search from now."""
+        self.search_start = time.perf_counter()
+        self.budget_nodes = self.nodes
+        self.deadline = self.search_start + self.time_ms / 1000 if self.time_ms > 0 else None
+        self.pondering = False
+
+    def get_ponder_move(self) -> int | None:
+        return self.ponder_move
+
+    def get_mate_score(self, env) -> int:
+        """Get the score of being checkmated on the move. Mates found closer to the root score further from zero.
+
+            Returns: Checkmate score.
+        """
+        return env.chess.score.piece_scores['CHECKMATE']
+
+    def is_mate_score(self, score: float, env) -> bool:
+        return abs(score) >= self.get_mate_score(env) - MAX_PLY
+
+    def _score_to_tt(self, score: float, ply: int, env) -> float:
+        """Mate scores are stored as distance from the stored position instead of from the root.
+
+            Returns: Score to store.
+        """
+        if self.is_mate_score(score, env):
+            return score + ply if score > 0 else score - ply
+        return score
+
+    def _score_from_tt(self, score: float, ply: int, env) -> float:
+        """Converts a stored mate score back to distance from the root.
+
+            Returns: Score at this ply.
+        """
+        if self.is_mate_score(score, env):
+            return score - ply if score > 0 else score + ply
+        return score
+
+    def evaluate(self, position, env) -> float:
+        """Static evaluation of the position from the side to move.
+
+            Returns: Material and piece-square score, positive if the side to move is ahead.
+        """
+        score = env.chess.evaluator.evaluate(position)
+        return score if position.whites_turn else -score
+
+    def is_in_check(self, position, env) -> bool:
+        king_position = position.kings[position.whites_turn]
+        if king_position is None:
+            return False
+        king_rank, king_file = divmod(king_position, env.chess.board.files)
+        return env.chess.check.is_square_attacked(king_rank, king_file, not position.whites_turn, position.board)
+
+    def has_non_pawn_material(self, position, env) -> bool:
+        """Checks if the side to move has a piece other than pawns and the king. Without one zugzwang is likely and null moves are unsafe.
+
+            Returns: True if the side to move has a knight, bishop, rook or queen.
+        """
+        pawn, _, _, _, _, king = env.chess.util.get_piece_table(env.chess.board.piece_numbers)['team_codes'][position.whites_turn]
+        board = position.board
+        for board_position in position.pieces[position.whites_turn]:
+            if board[board_position] != pawn and board[board_position] != king:
+                return True
+        return False
+
+    def order_moves(self, moves: list, position, env, tt_move: int = 0, ply: int | None = None, prev_move: int = 0) -> list:
+        """Orders moves with the stored best move first, then winning and even captures and promotions by MVV-LVA,
+            then quiet moves, then captures that lose material by static exchange evaluation.
+            Quiet moves are ordered killers first, then the counter move, then by history. Pass ply to use the quiet move tables.
+
+            Returns: New list of move codes.
+        """
+        board = position.board
+        exchange = env.chess.exchange
+        killers = self.killers[ply] if ply is not None else (0, 0)
+        counter_move = self.counter_moves[prev_move & BUTTERFLY_MASK] if ply is not None and prev_move != 0 else 0
+        history = self.history[position.whites_turn]
+        move_scores = []
+        for move in moves:
+            if move == tt_move:
+                move_score = SCORE_INF
+            elif move & MOVE_CAPTURE or (move >> MOVE_PROMOTION_SHIFT) & MOVE_PROMOTION_MASK != 0:
+                move_score = exchange.calc_mvv_lva(board, move)
+                if exchange.is_losing_capture(board, move):
+                    move_score += ORDER_BAD_CAPTURE
+                else:
+                    move_score += ORDER_GOOD_CAPTURE
+            elif move == killers[0]:
+                move_score = ORDER_KILLER + 1
+            elif move == killers[1]:
+                move_score = ORDER_KILLER
+            elif move == counter_move:
+                move_score = ORDER_COUNTER
+            else:
+                move_score = history[move & BUTTERFLY_MASK]
+            move_scores.append((move_score, move))
+        move_scores.sort(key=lambda move_score: -move_score[0])
+        return [move for _, move in move_scores]
+
+    def quiescence(self, position, env, alpha: float, beta: float, ply: int) -> float:
+        """Searches captures and promotions only until the position is quiet, so the main search never stops in the
+            middle of an exchange. The side to move may stand pat on the static evaluation instead of capturing.
+            In check there is no standing pat, every evasion is searched so checks and mates at the horizon are seen.
+
+            Returns: Score from the side to move.
+        """
+        self.nodes += 1
+        self.qnodes += 1
+        if ply > self.seldepth:
+            self.seldepth = ply
+        if self.check_budget():
+            return 0
+
+        in_check = self.is_in_check(position, env)
+        if in_check:
+            moves = env.chess.moves.get_valid_position_moves(position)
+            if len(moves) == 0:
+                return -self.get_mate_score(env) + ply
+            if ply >= MAX_PLY:
+                return self.evaluate(position, env)
+            best_score = -SCORE_INF
+        else:
+            stand_pat = self.evaluate(position, env)
+            if stand_pat >= beta or ply >= MAX_PLY:
+                return stand_pat
+            if stand_pat > alpha:
+                alpha = stand_pat
+            best_score = stand_pat
+            moves = env.chess.moves.get_tactical_move_codes(position)
+
+        for move in self.order_moves(moves, position, env):
+            #Captures that lose material are skipped unless they get out of check
+            if not in_check and env.chess.exchange.is_losing_capture(position.board, move):
+                continue
+            env.chess.moves.make_move_code(position, move)
+            score = -self.quiescence(position, env, -beta, -alpha, ply + 1)
+            env.chess.moves.unmake_move(position)
+            if self.stopped:
+                return 0
+
+            if score > best_score:
+                best_score = score
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                break
+        return best_score
+
+    def negamax(self, position, env, depth: int, alpha: float, beta: float, ply: int = 0, prev_move: int = 0, allow_null: bool = True) -> tuple:
+        """Searches the position to depth with an alpha-beta window. Scores are from the side to move.
+            prev_move is the move that led to the position, used for counter moves. allow_null is False right after a null move.
+
+            Returns: tuple[ score, principal variation (list of move codes) ]
+        """
+        self.nodes += 1
+        if ply > self.seldepth:
+            self.seldepth = ply
+        if ply > 0 and self.check_budget():
+            return 0, []
+        alpha_start = alpha
+
+        #Stored result that is deep enough and fits the window
+        tt_move = 0
+        if self.tt is not None:
+            entry = self.tt.probe(position.key)
+            if entry is not None:
+                entry_depth, entry_score, entry_bound, tt_move = entry
+                if entry_depth >= depth and ply > 0:
+                    entry_score = self._score_from_tt(entry_score, ply, env)
+                    if entry_bound == TT_EXACT or (entry_bound == TT_LOWER and entry_score >= beta) or (entry_bound == TT_UPPER and entry_score <= alpha):
+                        return entry_score, [tt_move] if tt_move != 0 else []
+        if ply == 0 and len(self.root_pv) > 0:
+            tt_move = self.root_pv[0]
+
+        if depth <= 0:
+            return self.quiescence(position, env, alpha, beta, ply), []
+
+        #Checkmate or stalemate
+        moves = env.chess.moves.get_valid_position_moves(position)
+        in_check = self.is_in_check(position, env)
+        if len(moves) == 0:
+            return (-self.get_mate_score(env) + ply if in_check else 0), []
+
+        static_eval = self.evaluate(position, env) if not in_check else -SCORE_INF
+        pv_node = beta - alpha > 1
+        frontier = ply > 0 and not pv_node and not in_check and not self.is_mate_score(alpha, env) and not self.is_mate_score(beta, env)
+
+        #Razoring, far below alpha at the frontier only captures can save the position so drop into quiescence
+        if frontier and depth < len(self.razor_margins) and static_eval + self.razor_margins[depth] <= alpha:
+            score = self.quiescence(position, env, alpha, alpha + 1, ply)
+            if self.stopped:
+                return 0, []
+            if depth == 1 or score <= alpha:
+                return score, []
+
+        #Null move pruning, if passing the turn still beats beta a real move will too
+        if (self.null_move and allow_null and ply > 0 and depth >= NULL_MOVE_MIN_DEPTH and not in_check and not self.is_mate_score(beta, env)
+                and self.has_non_pawn_material(position, env) and static_eval >= beta):
+            env.chess.moves.make_null_move(position)
+            score, _ = self.negamax(position, env, depth - 1 - NULL_MOVE_REDUCTION, -beta, -beta + 1, ply + 1, 0, False)
+            score = -score
+            env.chess.moves.unmake_null_move(position)
+            if self.stopped:
+                return 0, []
+            if score >= beta:
+                return beta, []
+
+        #Futility pruning, quiet moves cannot lift a position this far below alpha within the remaining depth
+        futile = frontier and depth < len(self.futility_margins) and static_eval + self.futility_margins[depth] <= alpha
+
+        best_score = -SCORE_INF
+        best_pv = []
+        killers = self.killers[ply]
+        self.cutoff_nodes += 1
+        for move_index, move in enumerate(self.order_moves(moves, position, env, tt_move, ply, prev_move)):
+            is_quiet = not move & MOVE_CAPTURE and (move >> MOVE_PROMOTION_SHIFT) & MOVE_PROMOTION_MASK == 0
+            env.chess.moves.make_move_code(position, move)
+            if futile and is_quiet and len(best_pv) > 0 and move != killers[0] and not self.is_in_check(position, env):
+                env.chess.moves.unmake_move(position)
+                best_score = max(best_score, static_eval + self.futility_margins[depth])
+                continue
+
+            #Principal variation search, the first move gets the full window and the rest are expected to fail low
+            if move_index == 0:
+                score, child_pv = self.negamax(position, env, depth - 1, -beta, -alpha, ply + 1, move)
+                score = -score
+            else:
+                #Late move reduction, quiet moves ordered late rarely beat alpha so try them shallower first
+                reduced = (self.lmr and move_index >= LMR_MIN_MOVES and depth >= LMR_MIN_DEPTH and is_quiet and not in_check
+                        and move != killers[0] and move != killers[1] and not self.is_in_check(position, env))
+                score, child_pv = self.negamax(position, env, depth - 1 - (LMR_REDUCTION if reduced else 0), -alpha - 1, -alpha, ply + 1, move)
+                score = -score
+                if reduced and score > alpha:
+                    score, child_pv = self.negamax(position, env, depth - 1, -alpha - 1, -alpha, ply + 1, move)
+                    score = -score
+                if score > alpha and score < beta:
+                    score, child_pv = self.negamax(position, env, depth - 1, -beta, -alpha, ply + 1, move)
+                    score = -score
+            env.chess.moves.unmake_move(position)
+            if self.stopped:
+                return 0, []
+
+            if score > best_score:
+                best_score = score
+                best_pv = [move] + child_pv
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                self.beta_cutoffs += 1
+                if move_index == 0:
+                    self.first_move_cutoffs += 1
+                if is_quiet:
+                    self.update_quiet_tables(move, position, depth, ply, prev_move)
+                break
+
+        if self.tt is not None:
+            bound = TT_UPPER if best_score <= alpha_start else TT_LOWER if best_score >= beta else TT_EXACT
+            self.tt.store(position.key, depth, self._score_to_tt(best_score, ply, env), bound, best_pv[0] if len(best_pv) > 0 else 0)
+        return best_score, best_pv
+
+    def search(self, position, env, depth: int) -> tuple:
+        """Searches the position to depth with a full window.
+
+            Returns: tuple[ score (side to move), principal variation (list of move codes), nodes searched ]
+        """
+        self.reset_counters()
+        self.stopped = False
+        self.budget_active = False
+        self.root_pv = []
+        score, pv = self.negamax(position, env, depth, -SCORE_INF, SCORE_INF)
+        return score, pv, self.nodes
+
+    def search_root(self, position, env, depth: int, alpha: float, beta: float) -> tuple:
+        """Searches the root on this process, or across the process pool when workers > 1.
+
+            Returns: tuple[ score, principal variation (list of move codes) ]
+        """
+        if self.workers <= 1 or self.parallel_mode != "ROOT" or depth <= 1:
+            return self.negamax(position, env, depth, alpha, beta)
+        moves = env.chess.moves.get_valid_position_moves(position)
+        if len(moves) == 0:
+            return self.negamax(position, env, depth, alpha, beta)
+        self.nodes += 1
+        moves = self.order_moves(moves, position, env, self.root_pv[0] if len(self.root_pv) > 0 else 0, 0)
+        return self.get_parallel(env).search(self, position, env, depth, alpha, beta, moves)
+
+    def aspiration_search(self, position, env, depth: int, guess: float | None) -> tuple:
+        """Searches the root with a narrow window around guess, widening the side that fails until the score lands inside.
+            Without a guess or near a mate the full window is used.
+
+            Returns: tuple[ score, principal variation (list of move codes) ]
+        """
+        if guess is None or self.is_mate_score(guess, env):
+            return self.search_root(position, env, depth, -SCORE_INF, SCORE_INF)
+        window_low = ASPIRATION_WINDOW
+        window_high = ASPIRATION_WINDOW
+        while True:
+            alpha = guess - window_low if window_low < SCORE_INF else -SCORE_INF
+            beta = guess + window_high if window_high < SCORE_INF else SCORE_INF
+            score, pv = self.search_root(position, env, depth, alpha, beta)
+            if self.stopped:
+                return score, pv
+            if score <= alpha and alpha > -SCORE_INF:
+                window_low = SCORE_INF if self.is_mate_score(score, env) or window_low >= ASPIRATION_MAX_WINDOW else window_low * 2
+            elif score >= beta and beta < SCORE_INF:
+                window_high = SCORE_INF if self.is_mate_score(score, env) or window_high >= ASPIRATION_MAX_WINDOW else window_high * 2
+            else:
+                return score, pv
+
+    def iterative_deepening(self, position, env) -> tuple:
+        """Searches depth 1, 2, ... up to max_depth until the time or node budget is spent. Each iteration searches the
+            principal variation of the one before first. An unfinished iteration is thrown away, depth 1 always finishes.
+            While pondering there is no budget until ponder_hit. The SearchStats of the search are left in self.stats.
+
+            Returns: tuple[ score (side to move), principal variation (list of move codes), nodes searched, depth completed ]
+        """
+        start = time.perf_counter()
+        self.reset_counters()
+        self.stats = SearchStats(type(self).__name__, self.is_white, position.key)
+        self.stopped = False
+        self.budget_active = False
+        pondered = self.pondering
+        if not self.pondering:
+            self.search_start = start
+            self.budget_nodes = 0
+            self.deadline = start + self.time_ms / 1000 if self.time_ms > 0 else None
+        self.root_pv = []
+        best_score, best_pv, depth_completed = 0, [], 0
+        #Lazy SMP helpers only help through the table, without one the search stays serial
+        if self.workers > 1 and self.parallel_mode == "LAZY_SMP" and self.tt is not None:
+            self.get_smp(env).start(position, self.max_depth)
+        for depth in range(1, max(self.max_depth, 1) + 1):
+            #Depth 1 runs outside the budget so there is always a move
+            self.budget_active = depth > 1
+            score, pv = self.aspiration_search(position, env, depth, best_score if depth_completed >= ASPIRATION_MIN_DEPTH - 1 else None)
+            if self.stopped:
+                break
+            best_score, best_pv, depth_completed = score, pv, depth
+            self.root_pv = pv
+            elapsed = time.perf_counter() - start
+            self.stats.add_iteration(depth, score, [env.chess.codes.to_str(move) for move in pv], self.nodes, self.qnodes, self.seldepth, elapsed)
+
+            #The next iteration takes several times as long as this one, do not start it without half the budget left
+            if not self.pondering:
+                if self.time_ms > 0 and (time.perf_counter() - self.search_start) * 2000 >= self.time_ms:
+                    break
+                if self.node_limit > 0 and (self.nodes - self.budget_nodes) * 2 >= self.node_limit:
+                    break
+            if self.is_mate_score(score, env):
+                break
+        if self.smp is not None and len(self.smp.helpers) > 0:
+            helper_nodes, helper_qnodes = self.smp.stop()
+            self.nodes += helper_nodes
+            self.qnodes += helper_qnodes
+        self.stats.finish(self.nodes, self.qnodes, time.perf_counter() - start, depth_completed, self.seldepth, best_score,
+                          [env.chess.codes.to_str(move) for move in best_pv], self.beta_cutoffs, self.first_move_cutoffs,
+                          self.cutoff_nodes, self.tt.get_stats() if self.tt is not None else None, self.stop_requested,
+                          #ponder_hit clears pondering once the opponent plays the expected move
+                          ("miss" if self.pondering else "hit") if pondered else None)
+        return best_score, best_pv, self.nodes, depth_completed
+
+    def calc_move(self, position, env) -> int | None:
+        print(f"Calculating next move...")
+        if self.tt is not None:
+            self.tt.new_search().reset_stats()
+        self.new_turn()
+        best_score, pv, nodes, depth = self.iterative_deepening(position, env)
+        self.record_stats(self.stats)
+        if self.stop_requested:
+            print("Search stopped")
+            return None
+        self.ponder_move = pv[1] if len(pv) > 1 else None
+        pv_str = " ".join(env.chess.codes.to_str(move) for move in pv)
+        print(f"DONE! Depth: {depth} Nodes Searched: {nodes} Score: {best_score} PV: {pv_str}")
+        return pv[0] if len(pv) > 0 else None
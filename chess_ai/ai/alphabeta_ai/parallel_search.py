@@ -0,0 +1,255 @@
+"""
+
+    Parallel alpha-beta search across a process pool
+
+    ROOT
+        The first root move is searched by the calling process to set alpha, the rest are handed to the pool
+        (young brothers wait). Every worker process builds its own GlobalChess and AlphaBetaAI once and keeps them,
+        so transposition table and ordering tables stay warm between tasks.
+
+        shared_alpha    best root score found so far, read once when a task starts and raised when a task beats it.
+                        A running task keeps the window it started with.
+        shared_nodes    nodes searched by every task of the root search, tasks add to it as they check their budget
+                        and stop every task once it reaches the node budget left when the pool search started
+        stop_event      set to stop every running task, ex: time or node budget spent or search cancelled
+
+    LAZY_SMP
+        Every worker runs its own iterative deepening on the same root next to the calling process, odd workers one ply deeper,
+        until stop_event is set. Nothing is returned but node counts, the workers help through the SharedTranspositionTable
+        all processes probe and store. Only the calling process's result is played.
+
+    Workers use the spawn start method and only import chess_logic and the AI, never pygame.
+
+"""
+import multiprocessing
+import time
+
+from ...chess_logic.global_chess import GlobalChess
+from ..shared_transposition_table import SharedTranspositionTable
+
+#Seconds to wait on a task before checking the budget again
+POLL_SECONDS = 0.005
+
+#Per process state of a pool worker, set by _init_worker
+_worker = {}
+
+class WorkerEnvironment:
+    def __init__(self, chess: GlobalChess, *args, **kwargs) -> None:
+        self.chess = chess
+
+def _init_worker(chess_settings: dict, ai_settings: dict, shared_alpha, stop_event, shared_nodes = None, tt_name: str | None = None, tt_mb: float = 0) -> None:
+    from .alphabeta_ai import AlphaBetaAI
+
+    chess = GlobalChess(
+        chess_settings['files'],
+        chess_settings['ranks'],
+        [],
+        chess_settings['piece_numbers'],
+        chess_settings['piece_scores'],
+        chess_settings['backend']
+    )
+    ai = AlphaBetaAI(True, **ai_settings)
+    ai.stop_event = stop_event
+    ai.shared_nodes = shared_nodes
+    if tt_name is not None:
+        ai.tt = SharedTranspositionTable(tt_mb, tt_name)
+    _worker['env'] = WorkerEnvironment(chess)
+    _worker['ai'] = ai
+    _worker['shared_alpha'] = shared_alpha
+    _worker['turn'] = None
+
+def _search_root_move(position, move: int, depth: int, beta: float, node_limit: int, turn: int) -> tuple:
+    """Searches one root move in a pool worker, null window against the shared alpha first and the full window if it lands inside.
+        node_limit is the budget of all tasks together, checked against shared_nodes.
+
+        Returns: tuple[ move code, score or None if stopped, principal variation after the move, nodes, qnodes ]
+    """
+    from .alphabeta_ai import BUDGET_CHECK_NODES
+
+    ai = _worker['ai']
+    env = _worker['env']
+    shared_alpha = _worker['shared_alpha']
+
+    #Tasks still queued when the search was stopped return without searching
+    if ai.stop_event.is_set():
+        return move, None, [], 0, 0
+
+    #Age the tables once per turn of the calling process
+    if _worker['turn'] != turn:
+        _worker['turn'] = turn
+        if ai.tt is not None:
+            ai.tt.new_search()
+        ai.new_turn()
+
+    ai.reset_counters()
+    ai.stopped = False
+    ai.stop_requested = False
+    ai.pondering = False
+    ai.budget_active = True
+    ai.deadline = None
+    ai.node_limit = node_limit
+    ai.budget_nodes = 0
+
+    alpha = shared_alpha.value
+    env.chess.moves.make_move_code(position, move)
+    score, child_pv = ai.negamax(position, env, depth - 1, -alpha - 1, -alpha, 1, move)
+    score = -score
+    if not ai.stopped and score > alpha and score < beta:
+        score, child_pv = ai.negamax(position, env, depth - 1, -beta, -alpha, 1, move)
+        score = -score
+    env.chess.moves.unmake_move(position)
+
+    #Nodes since the last budget check are not in shared_nodes yet
+    with ai.shared_nodes.get_lock():
+        ai.shared_nodes.value += ai.nodes % BUDGET_CHECK_NODES
+    if ai.stopped:
+        return move, None, [], ai.nodes, ai.qnodes
+
+    with shared_alpha.get_lock():
+        if score > shared_alpha.value:
+            shared_alpha.value = score
+    return move, score, child_pv, ai.nodes, ai.qnodes
+
+def _search_helper(position, max_depth: int, depth_offset: int, age: int) -> tuple:
+    """Runs iterative deepening from depth 1 + depth_offset in a pool worker until max_depth or stop_event.
+
+        Returns: tuple[ nodes, qnodes, deepest completed depth ]
+    """
+    from .alphabeta_ai import SCORE_INF
+
+    ai = _worker['ai']
+    env = _worker['env']
+
+    #Age the tables once per turn of the calling process
+    if ai.tt.age != age:
+        ai.tt.age = age
+        ai.new_turn()
+
+    ai.reset_counters()
+    ai.stopped = False
+    ai.stop_requested = False
+    ai.pondering = False
+    ai.budget_active = True
+    ai.deadline = None
+    ai.node_limit = 0
+    depth_completed = 0
+    for depth in range(1 + depth_offset, max(max_depth, 1) + 1):
+        ai.negamax(position, env, depth, -SCORE_INF, SCORE_INF)
+        if ai.stopped:
+            break
+        depth_completed = depth
+    return ai.nodes, ai.qnodes, depth_completed
+
+class ParallelRootSearch:
+    def __init__(self, workers: int, chess_settings: dict, ai_settings: dict, *args, **kwargs) -> None:
+        context = multiprocessing.get_context("spawn")
+        self.workers = workers
+        self.shared_alpha = context.Value('d', 0.0)
+        self.shared_nodes = context.Value('q', 0)
+        self.stop_event = context.Event()
+        self.pool = context.Pool(workers, _init_worker, (chess_settings, ai_settings, self.shared_alpha, self.stop_event, self.shared_nodes))
+        self.turn = 0
+
+    def new_turn(self) -> "ParallelRootSearch":
+        self.turn += 1
+        return self
+
+    def search(self, ai, position, env, depth: int, alpha: float, beta: float, moves: list) -> tuple:
+        """Searches the root moves in order. The first one is searched by ai in this process, the rest by the pool.
+            Stops every task once ai's stop request, time or node budget is spent and marks ai as stopped.
+
+            Returns: tuple[ score, principal variation (list of move codes) ]
+        """
+        #Eldest brother first to set alpha
+        first_move = moves[0]
+        env.chess.moves.make_move_code(position, first_move)
+        score, child_pv = ai.negamax(position, env, depth - 1, -beta, -alpha, 1, first_move)
+        env.chess.moves.unmake_move(position)
+        if ai.stopped:
+            return 0, []
+        best_score = -score
+        best_pv = [first_move] + child_pv
+        if best_score >= beta or len(moves) == 1:
+            return best_score, best_pv
+
+        #Younger brothers across the pool
+        self.shared_alpha.value = max(alpha, best_score)
+        self.stop_event.clear()
+        self.shared_nodes.value = 0
+        node_limit = max(ai.node_limit - (ai.nodes - ai.budget_nodes), 1) if ai.node_limit > 0 and ai.budget_active and not ai.pondering else 0
+        root_position = position.copy()
+        pending = [self.pool.apply_async(_search_root_move, (root_position, move, depth, beta, node_limit, self.turn)) for move in moves[1:]]
+        while len(pending) > 0:
+            pending[0].wait(POLL_SECONDS)
+            if not self.stop_event.is_set() and self._budget_spent(ai, node_limit):
+                self.stop_event.set()
+            still_pending = []
+            for result in pending:
+                if not result.ready():
+                    still_pending.append(result)
+                    continue
+                move, score, child_pv, nodes, qnodes = result.get()
+                ai.nodes += nodes
+                ai.qnodes += qnodes
+                if score is not None and score > best_score:
+                    best_score = score
+                    best_pv = [move] + child_pv
+            pending = still_pending
+
+        if self.stop_event.is_set():
+            self.stop_event.clear()
+            ai.stopped = True
+            return 0, []
+        return best_score, best_pv
+
+    def _budget_spent(self, ai, node_limit: int) -> bool:
+        if ai.stop_requested:
+            return True
+        if not ai.budget_active or ai.pondering:
+            return False
+        if node_limit > 0 and self.shared_nodes.value >= node_limit:
+            return True
+        return ai.deadline is not None and time.perf_counter() >= ai.deadline
+
+    def close(self) -> None:
+        self.pool.terminate()
+        self.pool.join()
+
+class LazySmpSearch:
+    def __init__(self, workers: int, chess_settings: dict, ai_settings: dict, tt_mb: float, *args, **kwargs) -> None:
+        context = multiprocessing.get_context("spawn")
+        self.workers = workers
+        self.tt = SharedTranspositionTable(tt_mb)
+        self.stop_event = context.Event()
+        self.pool = context.Pool(workers, _init_worker, (chess_settings, dict(ai_settings, tt_mb=0), context.Value('d', 0.0), self.stop_event, None, self.tt.name, tt_mb))
+        self.helpers = []
+
+    def start(self, position, max_depth: int) -> "LazySmpSearch":
+        """Starts every worker searching a copy of the position, stopping any helpers still running first.
+
+            Returns: Self for chaining
+        """
+        self.stop()
+        root_position = position.copy()
+        self.helpers = [self.pool.apply_async(_search_helper, (root_position, max_depth, index % 2, self.tt.age)) for index in range(self.workers)]
+        return self
+
+    def stop(self) -> tuple:
+        """Stops the helpers and waits for them.
+
+            Returns: tuple[ nodes, qnodes ] searched by the helpers
+        """
+        self.stop_event.set()
+        nodes, qnodes = 0, 0
+        for helper in self.helpers:
+            helper_nodes, helper_qnodes, _ = helper.get()
+            nodes += helper_nodes
+            qnodes += helper_qnodes
+        self.helpers = []
+        self.stop_event.clear()
+        return nodes, qnodes
+
+    def close(self) -> None:
+        self.pool.terminate()
+        self.pool.join()
+        self.tt.close()
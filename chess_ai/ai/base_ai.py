@@ -1,6 +1,67 @@
+from .search_stats import SearchStats
+
 class BaseAI:
-    def __init__(self, is_white: bool, *args, **kwargs):
+    def __init__(self, is_white: bool, *args, stats_path: str | None = None, **kwargs):
         self.is_white = is_white
-        
+
+        #Set from another thread to ask a running calc_move to return early
+        self.stop_requested = False
+
+        #True while calc_move searches the opponent's expected move on their time, the budget starts at ponder_hit
+        self.pondering = False
+
+        #Stats of the last calc_move, also appended to the JSON lines file at stats_path if set
+        self.stats_path = stats_path
+        self.last_stats = None
+
+    def calc_move(self, position, env) -> int | None:
+        """Searches a copy of the game position for a move. It must not change env, so it can run in a search worker.
+
+            Returns: Move code to play or None if there is no move.
+        """
+        return None
+
+    def stop(self) -> None:
+        """Asks a running calc_move to return as soon as it can. Its result is thrown away."""
+        self.stop_requested = True
+
+    def ponder_hit(self) -> None:
+        """The opponent played the expected move, so the running ponder search becomes the real search for this turn."""
+        self.pondering = False
+
+    def get_ponder_move(self) -> int | None:
+        """Get the opponent's expected reply to the last move found by calc_move.
+
+            Returns: Move code or None if there is no expected reply.
+        """
+        return None
+
+    def record_stats(self, stats: SearchStats) -> SearchStats:
+        """Keeps the stats of a finished calc_move and appends them to the stats file.
+
+            Returns: stats
+        """
+        self.last_stats = stats
+        if self.stats_path:
+            stats.write_json_line(self.stats_path)
+        return stats
+
+    def get_search_stats(self) -> SearchStats | None:
+        """Get the stats of the last calc_move.
+
+            Returns: SearchStats or None if the AI has not searched yet.
+        """
+        return self.last_stats
+
+    def close(self) -> None:
+        """Releases anything the AI started, ex: worker processes."""
+        return
+
+    def play_move(self, move: int | None, env) -> None:
+        if move is not None:
+            ro, fo, rf, ff = env.chess.codes.decode(move)
+            env.chess.move_piece(ro, fo, rf, ff, env.chess.codes.get_promotion_str(move) or "Q")
+
     def execute_turn(self, board: list, env):
-        return
\ No newline at end of file
+        self.play_move(self.calc_move(env.chess.get_position(), env), env)
+        return
@@ -1,71 +1,88 @@
 
 import random
+import time
 
 from ..base_ai import BaseAI
+from ..search_stats import SearchStats
+from ..transposition_table import TranspositionTable, TT_EXACT
+from ...chess_logic.chess_move_codes import MOVE_SQUARE_MASK, MOVE_TO_SHIFT
 
 #from ...environment import Environment
 
+#Their replies are scored differently from our moves, so their entries are stored under a salted key
+THEIR_KEY_SALT = 0x9E3779B97F4A7C15
+
 class CustomAI(BaseAI):
-    def __init__(self, is_white: bool, max_depth: int = 2, *args, **kwargs) -> None:
+    def __init__(self, is_white: bool, max_depth: int = 2, tt_mb: float = 16, *args, **kwargs) -> None:
         super().__init__(is_white, *args, **kwargs)
         self.max_depth = max_depth
         self.score_falloff_ratio = 0.90
         self.random_chance = 0.1
+        self.tt = TranspositionTable(tt_mb) if tt_mb > 0 else None
 
     def sort_move(self, move_tuple: tuple) -> int:
         return -move_tuple[0]
 
-    def order_move_list(self, move_list: list, board: list, is_white: bool, env) -> list:
+    def order_move_list(self, move_list: list, board: list, is_white: bool, env, tt_move: int = 0) -> list:
         move_tuple_list = []
-        for ro, fo, rf, ff in move_list:
-            piece_value = env.chess.util.get_piece_number_on_board(rf, ff, board, env.chess.board.files)
-            piece_score = env.chess.score.calc_piece_score_king(piece_value)
-            move_tuple_list.append((piece_score, (ro, fo, rf, ff)))
+        for move in move_list:
+            piece_value = board[(move >> MOVE_TO_SHIFT) & MOVE_SQUARE_MASK]
+            piece_score = env.chess.score.calc_piece_score_king(piece_value) if move != tt_move else float('inf')
+            move_tuple_list.append((piece_score, move))
         move_tuple_list.sort(key=self.sort_move)
         return move_tuple_list
 
     def calc_their_best_move(self, 
-                            board: list, 
-                            is_white: bool, 
+                            position, 
                             env, 
                             worst_prev_best_color_score: int, 
-                            castle_avail: str,
-                            en_passant: str,
                             prune: bool = False, 
                             depth: int = 0
         ) -> tuple:
         #Get Variables
+        is_white = position.whites_turn
         best_score = None
         best_color_score = None
         best_move = None
         branches = 0
 
+        #Reuse their reply to this position if it was searched to the same depth, otherwise try the stored move first
+        tt_key = position.key ^ THEIR_KEY_SALT
+        tt_move = 0
+        if self.tt is not None:
+            entry = self.tt.probe(tt_key)
+            if entry is not None:
+                entry_depth, entry_score, entry_bound, tt_move = entry
+                if entry_bound == TT_EXACT and entry_depth == depth:
+                    return entry_score, tt_move, 0
+
         #Loop through their moves to see what they would choose
-        moves_list = env.chess.moves.get_valid_team_moves(is_white, board, env.chess.state.castle_avail, env.chess.state.en_passant)
-        sorted_list = self.order_move_list(moves_list, board, is_white, env)
-        for sort_score, (ro, fo, rf, ff) in sorted_list:
+        moves_list = env.chess.moves.get_valid_position_moves(position)
+        sorted_list = self.order_move_list(moves_list, position.board, is_white, env, tt_move)
+        for sort_score, move in sorted_list:
+
+            #Stop early when asked, the position is whole between moves
+            if self.stop_requested:
+                break
 
-            #Get their new board for their moves
-            new_board, new_score, castle_str, en_passant_str = env.chess.moves.simulate_move( ro, fo, rf, ff, board, is_white, castle_avail, en_passant)
+            #Make their move on the position
+            env.chess.moves.make_move_code(position, move)
+            new_score = env.chess.score.calc_game_score(position.board, position.whites_turn, position)
 
             #Prune branch if found value higher than previous
             if worst_prev_best_color_score is not None and prune:
                 new_color_score = new_score if is_white else -new_score
                 if new_color_score > worst_prev_best_color_score:
+                    #Not stored, the pruned result depends on the caller's score and only exact entries are probed
+                    env.chess.moves.unmake_move(position)
                     return best_score, best_move, branches
 
             #Recurse if their is a recurse function
             deep_score, _, deep_branches = 0, None, 0
             if depth > 0:
-                deep_score, _, deep_branches = self.calc_best_recursion(
-                    new_board, 
-                    env, 
-                    not is_white, 
-                    castle_str,
-                    en_passant_str,
-                    depth - 1
-                )
+                deep_score, _, deep_branches = self.calc_best_recursion(position, env, depth - 1)
             branches += deep_branches
+            env.chess.moves.unmake_move(position)
 
             #Calculate their score
             total_score = new_score + deep_score * self.score_falloff_ratio if deep_score is not None else new_score
@@ -75,44 +92,59 @@ class CustomAI(BaseAI):
             if best_color_score is None or total_color_score > best_color_score:
                 best_color_score = total_color_score
                 best_score = total_score
-                best_move = (ro, fo, rf, ff)
+                best_move = move
             elif total_color_score == best_color_score and random.random() < self.random_chance:
                 best_color_score = total_color_score
                 best_score = total_score
-                best_move = (ro, fo, rf, ff)
+                best_move = move
             branches += 1
+        if self.tt is not None and best_move is not None and not self.stop_requested:
+            self.tt.store(tt_key, depth, best_score, TT_EXACT, best_move)
         return best_score, best_move, branches
     
-    def calc_our_best_move(self, board: list, env, is_white: bool, castle_avail: str, en_passant: str, depth: int = 0) -> tuple:
+    def calc_our_best_move(self, position, env, depth: int = 0) -> tuple:
         #Get Variables
+        is_white = position.whites_turn
         best_score = None
         best_color_score = None
         best_move = None
         branches = 0
         worst_prev_best_color_score = None
 
+        #Reuse this position if it was searched to the same depth (scores add up per ply, so other depths do not compare),
+        #otherwise try the stored move first
+        tt_move = 0
+        if self.tt is not None:
+            entry = self.tt.probe(position.key)
+            if entry is not None:
+                entry_depth, entry_score, entry_bound, tt_move = entry
+                if entry_bound == TT_EXACT and entry_depth == depth:
+                    return entry_score, tt_move, 0
+
         #Loop through all of our moves to see the best option
-        moves_list = env.chess.moves.get_valid_team_moves(is_white, board, env.chess.state.castle_avail, env.chess.state.en_passant)
-        sorted_list = self.order_move_list(moves_list, board, is_white, env)
-        for sort_score, (ro, fo, rf, ff) in sorted_list:
-            #Get new boards with our moves
-            new_board, new_score, castle_str, en_passant_str = env.chess.moves.simulate_move( ro, fo, rf, ff, board, is_white, castle_avail, en_passant)
+        moves_list = env.chess.moves.get_valid_position_moves(position)
+        sorted_list = self.order_move_list(moves_list, position.board, is_white, env, tt_move)
+        for sort_score, move in sorted_list:
+            #Stop early when asked, the position is whole between moves
+            if self.stop_requested:
+                break
+
+            #Make our move on the position
+            env.chess.moves.make_move_code(position, move)
+            new_score = env.chess.score.calc_game_score(position.board, position.whites_turn, position)
 
             #Calculate what their best response would be
             their_best_score, _, their_branches = None, None, 0
             if depth > 0:
                 their_best_score, _, their_branches = self.calc_their_best_move(
-                    new_board, 
-                    not is_white, 
+                    position, 
                     env, 
                     worst_prev_best_color_score,
-                    castle_str,
-                    en_passant_str, 
                     True,
                     depth - 1
                 )
             branches += their_branches
-            
+            env.chess.moves.unmake_move(position)
 
             #Calculate new total score from our score and their best score
             total_score = new_score
@@ -128,27 +160,44 @@ class CustomAI(BaseAI):
             if best_color_score is None or total_color_score > best_color_score:
                 best_color_score = total_color_score
                 best_score = total_score
-                best_move = (ro, fo, rf, ff)
+                best_move = move
             elif total_color_score == best_color_score and random.random() < self.random_chance:
                 best_color_score = total_color_score
                 best_score = total_score
-                best_move = (ro, fo, rf, ff)
+                best_move = move
             branches += 1
+        if self.tt is not None and best_move is not None and not self.stop_requested:
+            self.tt.store(position.key, depth, best_score, TT_EXACT, best_move)
         return best_score, best_move, branches
     
-    def calc_best_recursion(self, board: list, env, is_white: bool, castle_avail: str, en_passant: str, depth: int = 0):
-        best_move = self.calc_our_best_move(board, env, is_white, castle_avail, en_passant, depth)
+    def calc_best_recursion(self, position, env, depth: int = 0):
+        best_move = self.calc_our_best_move(position, env, depth)
         #print(f"Depth: {depth}  Best Move: {best_move}")
         return best_move
         
-    def execute_turn(self, board: list, env):
+    def calc_move(self, position, env) -> int | None:
         print(f"Calculating next move...")
-        best_score, best_move, branches = self.calc_best_recursion(board, env, self.is_white, env.chess.state.castle_avail, env.chess.state.en_passant, self.max_depth)
-        print(f"DONE! Branches Checked: {branches} and found Best Move: {best_move} with best score: {best_score}")
-        if best_move is not None:
-            ro, fo, rf, ff = best_move
-            env.chess.move_piece(ro, fo, rf, ff)
-        return 
+        stats = SearchStats(type(self).__name__, self.is_white, position.key)
+        start = time.perf_counter()
+        if self.tt is not None:
+            self.tt.new_search().reset_stats()
+        best_score, best_move, branches = self.calc_best_recursion(position, env, self.max_depth)
+        if self.stop_requested:
+            stats.finish(branches, 0, time.perf_counter() - start, self.max_depth, self.max_depth + 1, None, [],
+                         tt_stats=self.tt.get_stats() if self.tt is not None else None, stopped=True)
+            self.record_stats(stats)
+            print("Search stopped")
+            return None
+        print(f"DONE! Branches Checked: {branches} and found Best Move: {env.chess.codes.to_str(best_move) if best_move is not None else None} with best score: {best_score}")
+        if self.tt is not None:
+            print(f"Transposition Table: {self.tt.get_stats()}")
+
+        #Their replies are searched one ply deeper than max_depth counts
+        pv = [env.chess.codes.to_str(best_move)] if best_move is not None else []
+        stats.finish(branches, 0, time.perf_counter() - start, self.max_depth, self.max_depth + 1, best_score, pv,
+                     tt_stats=self.tt.get_stats() if self.tt is not None else None)
+        self.record_stats(stats)
+        return best_move
 
     # def calc_best_move_recurse(self, board: list, depth: int, env, is_white: bool) -> tuple | None:
     #     best_score = None
@@ -2,6 +2,8 @@ import yaml
 
 from .base_ai import BaseAI
 from .custom_ai.custom_ai import CustomAI
+from .alphabeta_ai.alphabeta_ai import AlphaBetaAI
+from .search_worker import SearchWorker
 
 class GlobalAI:
     def __init__(self,
@@ -9,34 +11,140 @@ class GlobalAI:
           white_player_str: str = "PLAYER",
           black_player_str: str = "PLAYER",
           paused: bool = False,  
+          tt_mb: float = 16,
+          alphabeta_depth: int = 3,
+          alphabeta_time_ms: int = 0,
+          alphabeta_nodes: int = 0,
+          alphabeta_null_move: bool = True,
+          alphabeta_lmr: bool = True,
+          alphabeta_futility_margins: list = None,
+          alphabeta_razor_margins: list = None,
+          alphabeta_workers: int = 1,
+          alphabeta_parallel_mode: str = "ROOT",
+          background_search: bool = True,
+          ponder: bool = False,
+          search_stats_file: str | None = None,
     *args, **kwargs) -> None:
         self.custom_depth = custom_depth
+        self.tt_mb = tt_mb
+        self.alphabeta_depth = alphabeta_depth
+        self.alphabeta_time_ms = alphabeta_time_ms
+        self.alphabeta_nodes = alphabeta_nodes
+        self.alphabeta_null_move = alphabeta_null_move
+        self.alphabeta_lmr = alphabeta_lmr
+        self.alphabeta_futility_margins = alphabeta_futility_margins
+        self.alphabeta_razor_margins = alphabeta_razor_margins
+        self.alphabeta_workers = alphabeta_workers
+        self.alphabeta_parallel_mode = alphabeta_parallel_mode
         self.white_player_str = white_player_str
         self.black_player_str = black_player_str
         self.white_player = None
         self.black_player = None
         self.paused = paused
 
+        #AI turns run in a search worker so the game loop keeps running while the AI thinks
+        self.background_search = background_search
+        self.worker = SearchWorker()
+
+        #Search the AI's expected position on the player's time, started once per position
+        self.ponder = ponder
+        self.ponder_key = None
+
+        #JSON lines file every AI search appends its SearchStats to, None or empty to only keep them on the AI
+        self.search_stats_file = search_stats_file
+
     def get_player_from_str(self, player_str: str, is_white: bool) -> None:
         if player_str == "PLAYER":
             return None
         elif player_str == "CUSTOM":
-            return CustomAI(is_white, self.custom_depth)
+            return CustomAI(is_white, self.custom_depth, self.tt_mb, stats_path=self.search_stats_file)
+        elif player_str == "ALPHABETA":
+            return AlphaBetaAI(is_white, self.alphabeta_depth, self.tt_mb, self.alphabeta_time_ms, self.alphabeta_nodes,
+                               self.alphabeta_null_move, self.alphabeta_lmr, self.alphabeta_futility_margins, self.alphabeta_razor_margins,
+                               self.alphabeta_workers, self.alphabeta_parallel_mode, stats_path=self.search_stats_file)
 
     def set_players(self):
+        self.close_players()
         self.white_player = self.get_player_from_str(self.white_player_str, True)
         self.black_player = self.get_player_from_str(self.black_player_str, False)
 
     def execute_player(self, player_str: str, player_value: BaseAI | None, board: list, env): 
         if player_str == "PLAYER":
             return
-        elif player_str == "CUSTOM":
-            player_value.execute_turn(board, env)
+        elif player_str == "CUSTOM" or player_str == "ALPHABETA":
+            if not self.background_search:
+                player_value.execute_turn(board, env)
+                return
+
+            #Wait for the running search, play its move once it is done or start a new one
+            if self.worker.is_running():
+                if self.worker.pondering and not self.worker.cancelled:
+                    #Hit or miss is recorded in the player's SearchStats
+                    if self.worker.player is player_value and self.worker.key == env.chess.state.zobrist_key:
+                        self.worker.ponder_hit()
+                    else:
+                        self.worker.cancel()
+                return
+            finished, move = self.worker.poll(player_value, env.chess.state.zobrist_key)
+            if finished:
+                player_value.play_move(move, env)
+            else:
+                self.worker.start(player_value, env.chess.get_position(), env)
+
+    def execute_ponder(self, whites_turn: bool, env) -> None:
+        """Starts a ponder search for the AI opponent of the player to move, on the position after the AI's expected reply."""
+        player_str = self.white_player_str if whites_turn else self.black_player_str
+        opponent_str = self.black_player_str if whites_turn else self.white_player_str
+        opponent_value = self.black_player if whites_turn else self.white_player
+        if player_str != "PLAYER" or opponent_str == "PLAYER" or opponent_value is None:
+            return
+        if self.ponder_key == env.chess.state.zobrist_key or self.worker.is_running():
+            return
+        self.ponder_key = env.chess.state.zobrist_key
+
+        #The expected reply comes from the AI's last search, make sure it is legal here
+        ponder_move = opponent_value.get_ponder_move()
+        position = env.chess.get_position()
+        if ponder_move is None or ponder_move not in env.chess.moves.get_valid_position_moves(position):
+            return
+        env.chess.moves.make_move_code(position, ponder_move)
+        self.worker.start(opponent_value, position, env, ponder=True)
+
+    def cancel_search(self) -> "GlobalAI":
+        """Stops the background search and throws away its move, ex: when the board is changed while the AI is thinking.
+
+            Returns: Self for chaining
+        """
+        self.worker.cancel()
+        return self
+
+    def close_players(self) -> "GlobalAI":
+        """Stops the background search, waits for it to end, then closes both AI players so their worker processes and
+            shared memory are released. Called when players are replaced and when the game exits.
+
+            Returns: Self for chaining
+        """
+        self.cancel_search()
+        self.worker.join()
+        for player in (self.white_player, self.black_player):
+            if player is not None:
+                player.close()
+        self.white_player = None
+        self.black_player = None
+        return self
+
+    def is_thinking(self) -> bool:
+        return self.worker.is_thinking()
+
+    def is_pondering(self) -> bool:
+        return self.worker.is_pondering()
         
     def execute_turn(self, whites_turn: bool, board: list, env): 
 
         if self.paused is True or env.chess.state.check_status == 'White Checkmate' or env.chess.state.check_status == 'Black Checkmate':
             return
+        if self.ponder and self.background_search:
+            self.execute_ponder(whites_turn, env)
         if whites_turn:
             self.execute_player(self.white_player_str, self.white_player, board, env)
         else:
@@ -50,6 +158,20 @@ class GlobalAI:
             self.white_player_str = settings["WHITE_PLAYER"]
             self.black_player_str = settings["BLACK_PLAYER"]
             self.paused = settings["PAUSED"]
+            #Keys added after the first config files default to the constructor values so older configs still load
+            self.tt_mb = settings.get("TT_MB", 16)
+            self.alphabeta_depth = settings.get("ALPHABETA_DEPTH", 3)
+            self.alphabeta_time_ms = settings.get("ALPHABETA_TIME_MS", 0)
+            self.alphabeta_nodes = settings.get("ALPHABETA_NODES", 0)
+            self.alphabeta_null_move = settings.get("ALPHABETA_NULL_MOVE", True)
+            self.alphabeta_lmr = settings.get("ALPHABETA_LMR", True)
+            self.alphabeta_futility_margins = settings.get("ALPHABETA_FUTILITY_MARGINS", None)
+            self.alphabeta_razor_margins = settings.get("ALPHABETA_RAZOR_MARGINS", None)
+            self.alphabeta_workers = settings.get("ALPHABETA_WORKERS", 1)
+            self.alphabeta_parallel_mode = settings.get("ALPHABETA_PARALLEL_MODE", "ROOT")
+            self.background_search = settings.get("BACKGROUND_SEARCH", True)
+            self.ponder = settings.get("PONDER", False)
+            self.search_stats_file = settings.get("SEARCH_STATS_FILE", None)
             self.set_players()
         return self
     
@@ -0,0 +1,127 @@
+"""
+
+    Search statistics
+
+        One SearchStats record per calc_move, with a row per completed iteration and the totals of the search.
+        It can be read from the AI with get_search_stats and appended to a JSON lines file, one record per line.
+
+        nodes                   nodes searched, quiescence included, counting pool workers
+        qnodes                  quiescence nodes
+        nps                     nodes per second
+        depth                   deepest completed iteration
+        seldepth                deepest ply reached, quiescence and extensions included
+        cutoff_rate             beta cutoffs per node that searched its moves
+        first_move_cutoff_rate  beta cutoffs by the first move searched per beta cutoff, a measure of move ordering
+        tt_hit_rate             transposition table probes that found their key
+        stopped                 the search was cancelled and its move thrown away
+        ponder                  None for a normal search, for a search on the opponent's time "hit" if the opponent played
+                                the expected move and the search became the real one, "miss" if it was thrown away
+
+        With a process pool only nodes and qnodes include the workers, the other counters are of the calling process.
+
+"""
+import json
+import time
+
+class SearchStats:
+    def __init__(self, player: str, is_white: bool, key: int = 0, *args, **kwargs) -> None:
+        self.player = player
+        self.is_white = is_white
+        self.key = key
+        self.started_at = time.time()
+        self.iterations = []
+
+        #Totals, set by finish
+        self.nodes = 0
+        self.qnodes = 0
+        self.time_s = 0.0
+        self.depth = 0
+        self.seldepth = 0
+        self.beta_cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.cutoff_nodes = 0
+        self.tt_stats = None
+        self.score = None
+        self.pv = []
+        self.stopped = False
+        self.ponder = None
+
+    def get_nps(self, nodes: int, time_s: float) -> float:
+        return nodes / time_s if time_s > 0 else 0.0
+
+    def add_iteration(self, depth: int, score: float, pv: list, nodes: int, qnodes: int, seldepth: int, time_s: float) -> "SearchStats":
+        """Records a completed iteration. pv is the principal variation as move strings, nodes and time count from the start of the search.
+
+            Returns: Self for chaining
+        """
+        self.iterations.append({
+            "depth": depth,
+            "score": score,
+            "nodes": nodes,
+            "qnodes": qnodes,
+            "nps": self.get_nps(nodes, time_s),
+            "seldepth": seldepth,
+            "time_s": time_s,
+            "pv": pv
+        })
+        return self
+
+    def finish(self, nodes: int, qnodes: int, time_s: float, depth: int, seldepth: int, score: float | None, pv: list,
+               beta_cutoffs: int = 0, first_move_cutoffs: int = 0, cutoff_nodes: int = 0, tt_stats: dict | None = None,
+               stopped: bool = False, ponder: str | None = None) -> "SearchStats":
+        """Sets the totals of the search. pv is the principal variation as move strings, cutoff_nodes the nodes that searched their moves.
+
+            Returns: Self for chaining
+        """
+        self.nodes = nodes
+        self.qnodes = qnodes
+        self.time_s = time_s
+        self.depth = depth
+        self.seldepth = seldepth
+        self.score = score
+        self.pv = pv
+        self.beta_cutoffs = beta_cutoffs
+        self.first_move_cutoffs = first_move_cutoffs
+        self.cutoff_nodes = cutoff_nodes
+        self.tt_stats = tt_stats
+        self.stopped = stopped
+        self.ponder = ponder
+        return self
+
+    def to_dict(self) -> dict:
+        """Get the record as plain values that can be written as JSON.
+
+            Returns: dict[  "player"    "is_white"    "key"    "started_at"    "nodes"    "qnodes"    "nps"    "time_s"    "depth"    "seldepth"
+                            "beta_cutoffs"    "cutoff_rate"    "first_move_cutoff_rate"    "tt_hit_rate"    "tt"    "score"    "pv"    "stopped"    "ponder"    "iterations"    ]
+        """
+        return {
+            "player": self.player,
+            "is_white": self.is_white,
+            "key": self.key,
+            "started_at": self.started_at,
+            "nodes": self.nodes,
+            "qnodes": self.qnodes,
+            "nps": self.get_nps(self.nodes, self.time_s),
+            "time_s": self.time_s,
+            "depth": self.depth,
+            "seldepth": self.seldepth,
+            "beta_cutoffs": self.beta_cutoffs,
+            "cutoff_rate": self.beta_cutoffs / self.cutoff_nodes if self.cutoff_nodes > 0 else 0.0,
+            "first_move_cutoff_rate": self.first_move_cutoffs / self.beta_cutoffs if self.beta_cutoffs > 0 else 0.0,
+            "tt_hit_rate": self.tt_stats["hit_rate"] if self.tt_stats is not None else None,
+            "tt": self.tt_stats,
+            "score": self.score,
+            "pv": self.pv,
+            "stopped": self.stopped,
+            "ponder": self.ponder,
+            "iterations": self.iterations
+        }
+
+    def write_json_line(self, path: str) -> "SearchStats":
+        """Appends the record to a JSON lines file.
+
+            Returns: Self for chaining
+        """
+        with open(path, "a") as f:
+            f.write(json.dumps(self.to_dict()) + "\n")
+        return self
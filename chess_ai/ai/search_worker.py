@@ -0,0 +1,98 @@
+"""
+
+    Background search worker
+
+        Runs an AI's calc_move on a copy of the game position in a daemon thread, so the pygame loop keeps drawing and
+        handling events while the AI thinks. The game loop polls for the move every frame.
+
+        A cancelled search is asked to stop and its move is thrown away. A new search only starts once the old thread has ended,
+        so an AI object is never searched by two threads at once.
+
+        A ponder search runs on the opponent's time on the position after their expected move, without a budget.
+        ponder_hit turns it into the search for the AI's turn, on a miss it is cancelled like any other search.
+
+"""
+import threading
+
+from .base_ai import BaseAI
+
+class SearchWorker:
+    def __init__(self, *args, **kwargs) -> None:
+        self.thread = None
+        self.player = None
+        self.key = None
+        self.move = None
+        self.done = False
+        self.cancelled = False
+        self.pondering = False
+
+    def start(self, player: BaseAI, position, env, ponder: bool = False) -> "SearchWorker":
+        """Starts searching the position for player in a new thread. The position must be a copy owned by the worker.
+            With ponder the search runs without a budget until ponder_hit.
+
+            Returns: Self for chaining
+        """
+        self.player = player
+        self.key = position.key
+        self.move = None
+        self.done = False
+        self.cancelled = False
+        self.pondering = ponder
+        player.stop_requested = False
+        player.pondering = ponder
+        self.thread = threading.Thread(target=self._run, args=(player, position, env), daemon=True)
+        self.thread.start()
+        return self
+
+    def _run(self, player: BaseAI, position, env) -> None:
+        self.move = player.calc_move(position, env)
+        self.done = True
+
+    def is_running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def is_thinking(self) -> bool:
+        return self.is_running() and not self.cancelled and not self.pondering
+
+    def is_pondering(self) -> bool:
+        return self.is_running() and not self.cancelled and self.pondering
+
+    def ponder_hit(self) -> "SearchWorker":
+        """The opponent played the move the running ponder search expected, so its budget starts now.
+
+            Returns: Self for chaining
+        """
+        if self.player is not None:
+            self.player.ponder_hit()
+        self.pondering = False
+        return self
+
+    def cancel(self) -> "SearchWorker":
+        """Asks the running search to stop and throws away its move.
+
+            Returns: Self for chaining
+        """
+        if self.player is not None and self.is_running():
+            self.player.stop()
+        self.cancelled = True
+        return self
+
+    def join(self, timeout: float | None = None) -> "SearchWorker":
+        """Waits for the search thread to end, ex: after cancel before the AI is closed.
+
+            Returns: Self for chaining
+        """
+        if self.thread is not None:
+            self.thread.join(timeout)
+        return self
+
+    def poll(self, player: BaseAI, key: int) -> tuple:
+        """Checks if the search for player on the position with Zobrist key has finished. The move is handed out only once.
+
+            Returns: tuple[ finished (bool), move code or None ]
+        """
+        if not self.done or self.cancelled or self.player is not player or self.key != key:
+            return False, None
+        self.done = False
+        self.thread = None
+        return True, self.move
@@ -0,0 +1,99 @@
+"""
+
+    Transposition table in shared memory
+
+        One multiprocessing.shared_memory block that every search process attaches to by name, so memory stays the same
+        whatever the number of processes. Buckets and replacement work like TranspositionTable.
+
+        Every slot is a packed entry of three 64 bit words:
+
+            check    key ^ score bits ^ info
+            score    score as a double
+            info     move code (bits 0-23) | depth (bits 24-31) | bound (bits 32-33) | age (bits 34-41)
+
+        There are no locks. A slot that is being written by another process at the same time fails the check and reads as a miss.
+
+"""
+from multiprocessing import shared_memory
+
+from .transposition_table import TranspositionTable, TT_SLOT_BYTES, TT_MOVE_MASK, TT_DEPTH_SHIFT, TT_BOUND_SHIFT, TT_AGE_SHIFT, get_bucket_count
+
+class SharedTranspositionTable(TranspositionTable):
+    def __init__(self, size_mb: float = 16, name: str | None = None, *args, **kwargs) -> None:
+        bucket_count = get_bucket_count(size_mb)
+        self.size_mb = size_mb
+        self.bucket_mask = bucket_count - 1
+
+        #Create the block, or attach to the one another process created
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=bucket_count * 2 * TT_SLOT_BYTES)
+            self.shm.buf[:] = bytes(self.shm.size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+        self.words = self.shm.buf.cast('Q')
+        self.doubles = self.shm.buf.cast('d')
+        self.age = 0
+
+        #Counters of this process
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.stores = 0
+
+    def clear(self) -> "SharedTranspositionTable":
+        """Empties every slot for every process and resets the counters of this process.
+
+            Returns: Self for chaining
+        """
+        self.shm.buf[:] = bytes(self.shm.size)
+        self.age = 0
+        self.reset_stats()
+        return self
+
+    def probe(self, key: int) -> tuple | None:
+        """Looks up the entry of a Zobrist key. Entries that fail the check count as misses.
+
+            Returns: tuple[ depth, score, bound, move code ] or None if the key is not stored.
+        """
+        words = self.words
+        slot = (key & self.bucket_mask) << 1
+        for index in (slot * 3, slot * 3 + 3):
+            info = words[index + 2]
+            if words[index] ^ words[index + 1] ^ info == key:
+                self.hits += 1
+                return (info >> TT_DEPTH_SHIFT) & 0xFF, self.doubles[index + 1], (info >> TT_BOUND_SHIFT) & 0x3, info & TT_MOVE_MASK
+        self.misses += 1
+        if words[slot * 3] != 0 or words[slot * 3 + 3] != 0:
+            self.collisions += 1
+        return None
+
+    def store(self, key: int, depth: int, score: float, bound: int, move: int | None) -> "SharedTranspositionTable":
+        """Stores an entry with the same slot choice as TranspositionTable. The check word is written last.
+
+            Returns: Self for chaining
+        """
+        words = self.words
+        index = ((key & self.bucket_mask) << 1) * 3
+        info = words[index + 2]
+        stored_key = words[index] ^ words[index + 1] ^ info
+        if stored_key != key and depth < (info >> TT_DEPTH_SHIFT) & 0xFF and (info >> TT_AGE_SHIFT) & 0xFF == self.age:
+            index += 3
+        info = ((move or 0) & TT_MOVE_MASK) | min(depth, 0xFF) << TT_DEPTH_SHIFT | bound << TT_BOUND_SHIFT | self.age << TT_AGE_SHIFT
+        self.doubles[index + 1] = score
+        words[index + 2] = info
+        words[index] = key ^ words[index + 1] ^ info
+        self.stores += 1
+        return self
+
+    def get_slot_count(self) -> int:
+        return len(self.words) // 3
+
+    def close(self) -> None:
+        """Detaches this process from the block. The process that created it also frees it."""
+        self.words.release()
+        self.doubles.release()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
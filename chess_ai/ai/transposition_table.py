@@ -0,0 +1,130 @@
+"""
+
+    Bounded transposition table
+
+        Entries live in preallocated arrays so the table never grows past its memory budget.
+        Each bucket holds two slots: slot 0 keeps the deepest entry, slot 1 is always replaced.
+
+        keys      array('Q')  Zobrist key of the entry, 0 if empty
+        scores    array('d')  score of the entry
+        infos     array('Q')  move code (bits 0-23) | depth (bits 24-31) | bound (bits 32-33) | age (bits 34-41)
+
+"""
+from array import array
+
+TT_EXACT = 0
+TT_LOWER = 1
+TT_UPPER = 2
+
+TT_SLOT_BYTES = 24
+TT_MOVE_MASK = 0xFFFFFF
+TT_DEPTH_SHIFT = 24
+TT_BOUND_SHIFT = 32
+TT_AGE_SHIFT = 34
+
+def get_bucket_count(size_mb: float) -> int:
+    """Get the largest power of two bucket count that fits the memory budget.
+
+        Returns: Number of two slot buckets.
+    """
+    bucket_count = 1
+    while bucket_count * 2 * 2 * TT_SLOT_BYTES <= size_mb * 1024 * 1024:
+        bucket_count *= 2
+    return bucket_count
+
+class TranspositionTable:
+    def __init__(self, size_mb: float = 16, *args, **kwargs) -> None:
+        bucket_count = get_bucket_count(size_mb)
+        self.size_mb = size_mb
+        self.bucket_mask = bucket_count - 1
+        self.keys = array('Q', [0]) * (bucket_count * 2)
+        self.scores = array('d', [0.0]) * (bucket_count * 2)
+        self.infos = array('Q', [0]) * (bucket_count * 2)
+        self.age = 0
+
+        #Counters
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.stores = 0
+
+    def clear(self) -> "TranspositionTable":
+        """Empties every slot and resets the counters.
+
+            Returns: Self for chaining
+        """
+        self.keys = array('Q', [0]) * len(self.keys)
+        self.infos = array('Q', [0]) * len(self.infos)
+        self.age = 0
+        self.reset_stats()
+        return self
+
+    def reset_stats(self) -> "TranspositionTable":
+        """Resets the hit, miss, collision and store counters.
+
+            Returns: Self for chaining
+        """
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.stores = 0
+        return self
+
+    def new_search(self) -> "TranspositionTable":
+        """Ages the table so entries from earlier searches give way in the depth preferred slot.
+
+            Returns: Self for chaining
+        """
+        self.age = (self.age + 1) & 0xFF
+        return self
+
+    def probe(self, key: int) -> tuple | None:
+        """Looks up the entry of a Zobrist key. A bucket holding only other keys counts as a collision.
+
+            Returns: tuple[ depth, score, bound, move code ] or None if the key is not stored.
+        """
+        slot = (key & self.bucket_mask) << 1
+        for index in (slot, slot + 1):
+            if self.keys[index] == key:
+                self.hits += 1
+                info = self.infos[index]
+                return (info >> TT_DEPTH_SHIFT) & 0xFF, self.scores[index], (info >> TT_BOUND_SHIFT) & 0x3, info & TT_MOVE_MASK
+        self.misses += 1
+        if self.keys[slot] != 0 or self.keys[slot + 1] != 0:
+            self.collisions += 1
+        return None
+
+    def store(self, key: int, depth: int, score: float, bound: int, move: int | None) -> "TranspositionTable":
+        """Stores an entry. It goes into the depth preferred slot if it is as deep, the same key or the slot is from an older search,
+            otherwise into the always replace slot.
+
+            Returns: Self for chaining
+        """
+        slot = (key & self.bucket_mask) << 1
+        info = self.infos[slot]
+        if self.keys[slot] != key and depth < (info >> TT_DEPTH_SHIFT) & 0xFF and (info >> TT_AGE_SHIFT) & 0xFF == self.age:
+            slot += 1
+        self.keys[slot] = key
+        self.scores[slot] = score
+        self.infos[slot] = ((move or 0) & TT_MOVE_MASK) | min(depth, 0xFF) << TT_DEPTH_SHIFT | bound << TT_BOUND_SHIFT | self.age << TT_AGE_SHIFT
+        self.stores += 1
+        return self
+
+    def get_slot_count(self) -> int:
+        return len(self.keys)
+
+    def get_stats(self) -> dict:
+        """Get the counters of the table.
+
+            Returns: dict[  "hits"    "misses"    "collisions"    "stores"    "hit_rate"    "slots"    "size_mb"    ]
+        """
+        probes = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "collisions": self.collisions,
+            "stores": self.stores,
+            "hit_rate": self.hits / probes if probes > 0 else 0.0,
+            "slots": self.get_slot_count(),
+            "size_mb": self.size_mb
+        }
@@ -2,11 +2,17 @@ from typing import Callable
 
 from .chess_utils import ChessUtils
 from .chess_board import ChessBoard
+from .chess_tables import ChessTables
 
 class ChessBaseMoves:
-    def __init__(self, utils: ChessUtils, board: ChessBoard, *args, **kwargs) -> None:
+    def __init__(self, utils: ChessUtils, board: ChessBoard, tables: ChessTables = None, *args, **kwargs) -> None:
         self.utils = utils
         self.board = board
+        self.tables = tables if tables is not None else ChessTables(board)
+
+        #Move function of each piece type and the piece_numbers dict it was built from
+        self._piece_functions_key = None
+        self._piece_functions = None
 
     def check_if_in_bounds(self, rank_i: int, file_i: int) -> bool:
         """Checks if the new position is located on the board.
@@ -75,159 +81,122 @@ class ChessBaseMoves:
 
             Returns: A list of all available moves: (rank, file) pairs
         """
-        piece_value = board[rank_i_old * self.board.files + file_i_old]
+        board_position_old = rank_i_old * self.board.files + file_i_old
+        own_color = int(board[board_position_old] / 10)
+        is_white = own_color == self.board.piece_numbers['WHITE']
+        tables = self.tables.get_tables()
         valid_moves = []
 
         #Add Basic Move
-        is_white = self.utils.get_is_white_from_piece_number(piece_value, self.board.piece_numbers)
-        new_rank_diff = -1 if is_white else 1
-        if is_white:
-            if self.check_if_in_bounds(rank_i_old + new_rank_diff, file_i_old):
-                if self.check_if_blocked(rank_i_old + new_rank_diff, file_i_old, board) is False:
-                    valid_moves.append((rank_i_old, file_i_old, rank_i_old + new_rank_diff, file_i_old))
-        else:
-            if self.check_if_in_bounds(rank_i_old + new_rank_diff, file_i_old):
-                if self.check_if_blocked(rank_i_old + new_rank_diff, file_i_old, board) is False:
-                    valid_moves.append((rank_i_old, file_i_old, rank_i_old + new_rank_diff, file_i_old))
+        for r, f, board_position in tables['pawn_pushes'][is_white][board_position_old]:
+            if board[board_position] == 0:
+                valid_moves.append((rank_i_old, file_i_old, r, f))
 
         #Add Pawn Attacking Moves
-        pawn_attack_moves = self.get_pawn_attack_moves(rank_i_old, file_i_old, is_white)
-        for new_r, new_f in pawn_attack_moves:
-            if self.check_if_in_bounds(new_r, new_f) is True and self.check_if_blocked(new_r, new_f, board) is True:
-                if self.check_if_capturable(rank_i_old, file_i_old, new_r, new_f, board):
-                    valid_moves.append((rank_i_old, file_i_old, new_r, new_f))
+        for r, f, board_position in tables['pawn_attacks'][is_white][board_position_old]:
+            piece_value = board[board_position]
+            if piece_value != 0 and int(piece_value / 10) != own_color:
+                valid_moves.append((rank_i_old, file_i_old, r, f))
 
         #Add Starting double move
-        if rank_i_old == 1 and not is_white:
-            if self.check_if_blocked(rank_i_old + 2, file_i_old, board) is False and self.check_if_blocked(rank_i_old + 1, file_i_old, board) is False:
-                valid_moves.append((rank_i_old, file_i_old, rank_i_old + 2, file_i_old))
-        elif rank_i_old == self.board.ranks - 2 and is_white:
-            if self.check_if_blocked(rank_i_old - 2, file_i_old, board) is False and self.check_if_blocked(rank_i_old - 1, file_i_old, board) is False:
-                valid_moves.append((rank_i_old, file_i_old, rank_i_old - 2, file_i_old))
+        if len(valid_moves) > 0 and valid_moves[0][3] == file_i_old:
+            if rank_i_old == 1 and not is_white:
+                if board[board_position_old + 2 * self.board.files] == 0:
+                    valid_moves.append((rank_i_old, file_i_old, rank_i_old + 2, file_i_old))
+            elif rank_i_old == self.board.ranks - 2 and is_white:
+                if board[board_position_old - 2 * self.board.files] == 0:
+                    valid_moves.append((rank_i_old, file_i_old, rank_i_old - 2, file_i_old))
 
         return valid_moves
 
-    def check_knight_moves(self, rank_i_old: int, file_i_old: int, board: list) -> list:
-        """Checks all available moves for the type of KNIGHT.
+    def _check_leaper_moves(self, rank_i_old: int, file_i_old: int, targets: list, board: list) -> list:
+        """Checks the table targets of a piece that jumps (KNIGHT, KING). Targets that are open or capturable are kept.
 
             Returns: A list of all available moves: (rank, file) pairs
         """
+        own_color = int(board[rank_i_old * self.board.files + file_i_old] / 10)
         valid_moves = []
+        for r, f, board_position in targets:
+            piece_value = board[board_position]
+            if piece_value == 0 or int(piece_value / 10) != own_color:
+                valid_moves.append((rank_i_old, file_i_old, r, f))
+        return valid_moves
 
-        #Check      top right,     top left,      bottom_right,     bottom_left
-        checks = [(2,1), (1,2), (2,-1), (1,-2), (-2,1), (-1,2), (-2,-1), (-1,-2)]
+    def _check_slider_moves(self, rank_i_old: int, file_i_old: int, rays: list, board: list) -> list:
+        """Walks the table rays of a sliding piece (BISHOP, ROOK, QUEEN) until each is blocked, keeping a capture of the blocking piece.
 
-        #Loop through all checks
-        for r_d, f_d in checks:
-            r, f = rank_i_old + r_d, file_i_old + f_d
-            if self.check_if_open(rank_i_old, file_i_old, r, f, board):
-                valid_moves.append((rank_i_old, file_i_old, r, f))
+            Returns: A list of all available moves: (rank, file) pairs
+        """
+        own_color = int(board[rank_i_old * self.board.files + file_i_old] / 10)
+        valid_moves = []
+        for ray in rays:
+            for r, f, board_position in ray:
+                piece_value = board[board_position]
+                if piece_value == 0:
+                    valid_moves.append((rank_i_old, file_i_old, r, f))
+                else:
+                    if int(piece_value / 10) != own_color:
+                        valid_moves.append((rank_i_old, file_i_old, r, f))
+                    break
         return valid_moves
 
+    def check_knight_moves(self, rank_i_old: int, file_i_old: int, board: list) -> list:
+        """Checks all available moves for the type of KNIGHT.
+
+            Returns: A list of all available moves: (rank, file) pairs
+        """
+        targets = self.tables.get_tables()['knight'][rank_i_old * self.board.files + file_i_old]
+        return self._check_leaper_moves(rank_i_old, file_i_old, targets, board)
 
     def check_bishop_moves(self, rank_i_old: int, file_i_old: int, board: list) ->list:
         """Checks all available moves for the type of BISHOP.
 
             Returns: A list of all available moves: (rank, file) pairs
         """
-        valid_moves = []
-
-        #Check top right, top left, bottom_right, bottom_left
-        checks = [(1,1), (1,-1), (-1,1), (-1,-1)]
-
-        #Loop through all checks
-        for r_d, f_d in checks:
-            blocked = False
-            r, f = rank_i_old, file_i_old
-            while blocked is False:
-                r = r + r_d
-                f = f + f_d
-                if self.check_if_in_bounds(r, f) is False:
-                    blocked = True
-                elif self.check_if_blocked(r, f, board):
-                    if self.check_if_capturable(rank_i_old, file_i_old, r, f, board):
-                        valid_moves.append((rank_i_old, file_i_old, r, f))
-                    blocked = True
-                else:
-                    valid_moves.append((rank_i_old, file_i_old, r, f))
-
-        return valid_moves
+        rays = self.tables.get_tables()['bishop_rays'][rank_i_old * self.board.files + file_i_old]
+        return self._check_slider_moves(rank_i_old, file_i_old, rays, board)
 
     def check_rook_moves(self, rank_i_old: int, file_i_old: int, board: list) -> list:
         """Checks all available moves for the type of ROOK.
 
             Returns: A list of all available moves: (rank, file) pairs
         """
-        valid_moves = []
-
-        #Check right, left, top, bottom
-        checks = [(0,1), (0,-1), (1,0), (-1,0)]
-
-        #Loop through all checks
-        for r_d, f_d in checks:
-            blocked = False
-            r, f = rank_i_old, file_i_old
-            while blocked is False:
-                r = r + r_d
-                f = f + f_d
-                if self.check_if_in_bounds(r, f) is False:
-                    blocked = True
-                elif self.check_if_blocked(r, f, board):
-                    if self.check_if_capturable(rank_i_old, file_i_old, r, f, board):
-                        valid_moves.append((rank_i_old, file_i_old, r, f))
-                    blocked = True
-                else:
-                    valid_moves.append((rank_i_old, file_i_old, r, f))
-
-        return valid_moves
+        rays = self.tables.get_tables()['rook_rays'][rank_i_old * self.board.files + file_i_old]
+        return self._check_slider_moves(rank_i_old, file_i_old, rays, board)
 
     def check_queen_moves(self, rank_i_old: int, file_i_old: int, board: list):
         """Checks all available moves for the type of QUEEN.
 
             Returns: A list of all available moves: (rank, file) pairs
         """
-        bishop_moves = self.check_bishop_moves(rank_i_old, file_i_old, board)
-        rook_moves = self.check_rook_moves(rank_i_old, file_i_old, board)
-        return bishop_moves + rook_moves
-
+        rays = self.tables.get_tables()['queen_rays'][rank_i_old * self.board.files + file_i_old]
+        return self._check_slider_moves(rank_i_old, file_i_old, rays, board)
 
     def check_king_moves(self, rank_i_old: int, file_i_old: int, board: list):
         """Checks all available moves for the type of KING.
 
             Returns: A list of all available moves: (rank, file) pairs
         """
-        valid_moves = []
-
-        ro, fo = rank_i_old - 1, file_i_old - 1
-        for ri in range(3):
-            for fi in range(3):
-                r, f = ro + ri, fo + fi
-                if self.check_if_open(rank_i_old, file_i_old, r, f, board):
-                    valid_moves.append((rank_i_old, file_i_old, r, f))
-        return valid_moves
+        targets = self.tables.get_tables()['king'][rank_i_old * self.board.files + file_i_old]
+        return self._check_leaper_moves(rank_i_old, file_i_old, targets, board)
 
     def get_piece_type_function(self, rank_i_old: int, file_i_old: int, board: list) -> Callable | None:
         """Checks they type of piece located at (rank_i_old, file_i_old) and determines which types of move check function to return.
 
             Returns: Check Moves Function specific to the type of piece at (rank_i_old, file_i_old)
         """
-        piece_value = board[rank_i_old * self.board.files + file_i_old]
-        if piece_value % 10 == self.board.piece_numbers['NONE']:
-            return None
-        elif piece_value % 10 == self.board.piece_numbers['PAWN']:
-            return self.check_pawn_moves
-        elif piece_value % 10 == self.board.piece_numbers['KNIGHT']:
-            return self.check_knight_moves
-        elif piece_value % 10 == self.board.piece_numbers['BISHOP']:
-            return self.check_bishop_moves
-        elif piece_value % 10 == self.board.piece_numbers['ROOK']:
-            return self.check_rook_moves
-        elif piece_value % 10 == self.board.piece_numbers['QUEEN']:
-            return self.check_queen_moves
-        elif piece_value % 10 == self.board.piece_numbers['KING']:
-            return self.check_king_moves
-        else:
-            return None
+        piece_numbers = self.board.piece_numbers
+        if piece_numbers is not self._piece_functions_key:
+            self._piece_functions = [None] * 10
+            for piece_type, piece_function in (('PAWN', self.check_pawn_moves),
+                                               ('KNIGHT', self.check_knight_moves),
+                                               ('BISHOP', self.check_bishop_moves),
+                                               ('ROOK', self.check_rook_moves),
+                                               ('QUEEN', self.check_queen_moves),
+                                               ('KING', self.check_king_moves)):
+                self._piece_functions[piece_numbers[piece_type]] = piece_function
+            self._piece_functions_key = piece_numbers
+        return self._piece_functions[board[rank_i_old * self.board.files + file_i_old] % 10]
     
     def get_base_moves(self, rank_i_old: int, file_i_old: int, board: list) -> list:
         """Gets All Base Moves for Piece located at (rank_i_old, file_i_old).
@@ -252,4 +221,27 @@ class ChessBaseMoves:
         if board_position_old < len(new_board) and board_position_new < len(new_board):
             new_board[board_position_new] = new_board[board_position_old]
             new_board[board_position_old] = 0
-        return new_board
\ No newline at end of file
+        return new_board
+
+    def base_move_in_place(self, rank_i_old: int, file_i_old: int, rank_i_new: int, file_i_new: int, board: list) -> int:
+        """Moves a piece on the passed board without copying it. Take the move back with undo_base_move.
+
+            Returns: Piece number that was on the new position.
+        """
+        board_position_old = rank_i_old * self.board.files + file_i_old
+        board_position_new = rank_i_new * self.board.files + file_i_new
+        captured_value = board[board_position_new]
+        board[board_position_new] = board[board_position_old]
+        board[board_position_old] = 0
+        return captured_value
+
+    def undo_base_move(self, rank_i_old: int, file_i_old: int, rank_i_new: int, file_i_new: int, board: list, captured_value: int) -> list:
+        """Takes back a move made with base_move_in_place.
+
+            Returns: The passed board.
+        """
+        board_position_old = rank_i_old * self.board.files + file_i_old
+        board_position_new = rank_i_new * self.board.files + file_i_new
+        board[board_position_old] = board[board_position_new]
+        board[board_position_new] = captured_value
+        return board
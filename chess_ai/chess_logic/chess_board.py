@@ -1,11 +1,13 @@
 
 
 class ChessBoard:
-    def __init__(self, board: list = None, board_ranks: int = 8, board_files: int = 8, piece_numbers: dict = None, *args, **kargs) -> None:
+    def __init__(self, board: list = None, board_ranks: int = 8, board_files: int = 8, piece_numbers: dict = None, backend: str = "LIST", *args, **kargs) -> None:
         self.board = board
         self.ranks = board_ranks
         self.files = board_files
         self.piece_numbers = piece_numbers
+        self.backend = backend
+        self.bitboards = None
 
     def reset(self, board: list = None) -> "ChessBoard":
         if board is None:
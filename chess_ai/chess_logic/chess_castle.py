@@ -54,16 +54,16 @@ class ChessCastle:
         return valid_moves
     
     def filter_castle_check(self, rank_i_old: int, file_i_old: int, board: list, move_list: list, is_white: bool, king_value: int) -> list:
-        if self.check.check_for_check(king_value, board):
+        if self.check.is_square_attacked(rank_i_old, file_i_old, not is_white, board):
             return []
         valid_list = []
         for r, f in move_list:
             side = self.get_castle_side(file_i_old, f)
             if side == "K":
-                if self.check.check_move_cause_check(rank_i_old, file_i_old, r, f - 1, board) is False:
+                if self.check.is_square_attacked(r, f - 1, not is_white, board) is False:
                     valid_list.append((r, f))
             if side == "Q":
-                if self.check.check_move_cause_check(rank_i_old, file_i_old, r, f + 1, board) is False:
+                if self.check.is_square_attacked(r, f + 1, not is_white, board) is False:
                     valid_list.append((r, f))
         return valid_list
 
@@ -2,6 +2,7 @@
 from .chess_board import ChessBoard
 from .chess_utils import ChessUtils
 from .chess_base_moves import ChessBaseMoves
+from .chess_position import ChessPosition
 
 
 class ChessCheck:
@@ -10,6 +11,17 @@ class ChessCheck:
         self.board = board
         self.base_moves = base_move
 
+        #Legal move generator, attached by GlobalChess once it is built since it depends on this class
+        self.moves = None
+
+    def set_moves(self, moves) -> "ChessCheck":
+        """Attaches the ChessMovesNew whose legal move generator decides checkmate and stalemate.
+
+            Returns: Self for chaining
+        """
+        self.moves = moves
+        return self
+
     def get_king_position(self, king_value, board: list) -> tuple | None:
         """Get the kings rank and file by checking the board in the parameters.
 
@@ -98,11 +110,13 @@ class ChessCheck:
 
             Returns: True if the move will cause a check, false if otherwise.
         """
-        new_board = self.base_moves.base_move(rank_i_old, file_i_old, rank_i_new, file_i_new, board)
         moving_piece = board[rank_i_old * self.board.files + file_i_old]
         is_white = self.utils.get_is_white_from_piece_number(moving_piece, self.board.piece_numbers)
         king_value = self.utils.get_piece_number_from_str('K', self.board.piece_numbers) if is_white else self.utils.get_piece_number_from_str('k', self.board.piece_numbers)
-        return self.check_for_check(king_value, new_board)
+        captured_value = self.base_moves.base_move_in_place(rank_i_old, file_i_old, rank_i_new, file_i_new, board)
+        causes_check = self.check_for_check(king_value, board)
+        self.base_moves.undo_base_move(rank_i_old, file_i_old, rank_i_new, file_i_new, board, captured_value)
+        return causes_check
 
     def check_all_available_moves(self, is_white: bool, board: list) -> list:
         """Checks all available moves for check. If a move causes a check, it is removed from the list of valid moves.
@@ -148,169 +162,112 @@ class ChessCheck:
                 
         return check_status
     
-    def get_king_position_fast(self, king_value, king_is_white: bool, board: list) -> tuple | None:
-        """Get the kings rank and file by checking the board in the parameters.
+    def is_square_attacked(self, rank_i: int, file_i: int, by_white: bool, board: list) -> bool:
+        """Checks if the square (rank_i, file_i) is attacked by the team by_white.
+            Probes outward from the square (pawn, knight and king targets then sliding rays) and stops at the first attacker.
 
-            Returns: tuple[rank_i, file_i] of the king location. None if king is not found.
+            Returns: True if the square is attacked, false if otherwise.
         """
-        rank_i, rank_diff = (0, 1) if not king_is_white else (self.board.ranks - 1, -1)
-        while (rank_i >= 0 and rank_i < self.board.ranks):
-            file_i = 0
-            while file_i < self.board.files:
-                if board[rank_i * self.board.files + file_i] == king_value:
-                    return rank_i, file_i
-                file_i += 1
-            rank_i += rank_diff
-        return None
-    
-    def check_piece_moves_cause_check_fast(self, king_rank: int, king_file: int, piece_rank: int, piece_file: int, piece_function: any, board: list) -> bool:
-        moves_checked = 0
-        piece_moves = piece_function(piece_rank, piece_file, board)
-        for old_r, old_f, new_r, new_f in piece_moves:
-            moves_checked += 1
-            if (new_r, new_f) == (king_rank, king_file):
-                return True
-        return False
+        board_position = rank_i * self.board.files + file_i
+        tables = self.base_moves.tables.get_tables()
+        pawn, knight, bishop, rook, queen, king = self.utils.get_piece_table(self.board.piece_numbers)['team_codes'][by_white]
 
-    
-    def check_piece_causes_check_fast(self, king_rank: int, king_file: int, piece_rank: int, piece_file: int, piece_str: str, board: list) -> bool:
-        if piece_str == "P":
-             if king_file == piece_file - 1 or king_file == piece_file + 1:
-                if king_rank == piece_rank - 1 or king_rank == piece_rank + 1:
-                    return self.check_piece_moves_cause_check_fast(king_rank, king_file, piece_rank, piece_file, self.base_moves.check_pawn_moves, board)
-        elif piece_str == "N":
-            if king_file >= piece_file - 2 and king_file <= piece_file + 2:
-                if king_rank >= piece_rank - 2 and king_rank <= piece_rank + 2:
-                    return self.check_piece_moves_cause_check_fast(king_rank, king_file, piece_rank, piece_file, self.base_moves.check_knight_moves, board)
-        elif piece_str == "B":
-            if king_rank + king_file == piece_rank + piece_file or king_rank - king_file == piece_rank - piece_file:
-                return self.check_piece_moves_cause_check_fast(king_rank, king_file, piece_rank, piece_file, self.base_moves.check_bishop_moves, board)
-        elif piece_str == "R":
-            if king_file == piece_file or king_rank == piece_rank:
-                return self.check_piece_moves_cause_check_fast(king_rank, king_file, piece_rank, piece_file, self.base_moves.check_rook_moves, board)
-        elif piece_str == "Q":
-            if king_file == piece_file or king_rank == piece_rank or king_rank + king_file == piece_rank + piece_file or king_rank - king_file == piece_rank - piece_file:
-                return self.check_piece_moves_cause_check_fast(king_rank, king_file, piece_rank, piece_file, self.base_moves.check_queen_moves, board)
-        elif piece_str == "K":
-            if king_file >= piece_file - 1 and king_file <= piece_file + 1:
-                if king_rank >= piece_rank - 1 and king_rank <= piece_rank + 1:
-                    return self.check_piece_moves_cause_check_fast(king_rank, king_file, piece_rank, piece_file, self.base_moves.check_king_moves, board)
-        return False
-
-    
-    def check_all_moves_for_check_fast(self, king_rank: int, king_file: int, king_is_white: bool, board: list) -> bool:
-        rank_i, rank_diff = (0, 1) if king_is_white else (self.board.ranks - 1, -1)
-        while (rank_i >= 0 and rank_i < self.board.ranks):
-            file_i = 0
-            while (file_i < self.board.files):
-                piece_str = self.utils.get_str_from_piece_type(board[rank_i * self.board.files + file_i], self.board.piece_numbers, True)
-                if piece_str is not None:
-                    piece_color = self.utils.get_is_white_from_piece_number(board[rank_i * self.board.files + file_i], self.board.piece_numbers)
-                    if piece_color is not king_is_white:
-                        if self.check_piece_causes_check_fast(king_rank, king_file, rank_i, file_i, piece_str, board):
-                            return True
-                file_i += 1
-            rank_i += rank_diff
-        return False
+        #Pawns attack forward, so look along the other team's pawn attacks
+        for _, _, target in tables['pawn_attacks'][not by_white][board_position]:
+            if board[target] == pawn:
+                return True
 
-    
-    def check_for_check_fast(self, king_str: str, board: list) -> bool:
-        king_value = self.utils.get_piece_number_from_str(king_str, self.board.piece_numbers)
-        is_white = True if king_str == 'K' else False
-        king_pos = self.get_king_position_fast(king_value, is_white, board)
-        if king_pos is not None:
-            return self.check_all_moves_for_check_fast(king_pos[0], king_pos[1], is_white, board)
-        print("WARNING: Unable to determine King Position")
-        return False
+        #Knights
+        for _, _, target in tables['knight'][board_position]:
+            if board[target] == knight:
+                return True
 
-    def get_piece_locations_fast(self, king_is_white: bool, board: list) -> list:
-        rank_i, rank_diff = 0, 1
-        piece_locations = []
-        while (rank_i >= 0 and rank_i < self.board.ranks):
-            file_i = 0
-            while file_i < self.board.files:
-                piece_str = self.utils.get_str_from_piece_type(board[rank_i * self.board.files + file_i], self.board.piece_numbers, True)
-                if piece_str is not None:
-                    piece_color = self.utils.get_is_white_from_piece_number(board[rank_i * self.board.files + file_i], self.board.piece_numbers)
-                    if piece_color is king_is_white:
-                        piece_locations.append((rank_i, file_i))
-                file_i += 1
-            rank_i += rank_diff
-        return piece_locations 
-    
-    def filter_related_position_fast(self,  king_rank: int, king_file: int, piece_rank: int, piece_file: int) -> bool:
-        return True
-        if king_file >= piece_file - 2 and king_file <= piece_file + 2:
-            if king_rank >= piece_rank - 2 and king_rank <= piece_rank + 2:
+        #King
+        for _, _, target in tables['king'][board_position]:
+            if board[target] == king:
                 return True
-        elif king_file == piece_file or king_rank == piece_rank or king_rank + king_file == piece_rank + piece_file or king_rank - king_file == piece_rank - piece_file:
-            return True
+
+        #Sliding rays, only the first piece on each ray can attack
+        for rays, slider in ((tables['bishop_rays'][board_position], bishop), (tables['rook_rays'][board_position], rook)):
+            for ray in rays:
+                for _, _, target in ray:
+                    piece_value = board[target]
+                    if piece_value != 0:
+                        if piece_value == slider or piece_value == queen:
+                            return True
+                        break
         return False
 
-    def check_move_causes_check_fast(self, king_rank: int, king_file: int, king_is_white: bool, rank_i_old: int, file_i_old: int, rank_i_new: int, file_i_new: int, board: list) -> bool:
-        """Check if a new move (rank_i_old, file_i_old) -> (rank_i_new, file_i_new) will cause a check on the player's king from the passed board.
+    def get_pins_and_checkers(self, king_rank: int, king_file: int, king_is_white: bool, board: list) -> tuple:
+        """Finds the other team's pieces giving check and the pieces pinned to the king (king_rank, king_file).
+            Walks each ray out from the king once.
 
-            Returns: True if the move will cause a check, false if otherwise.
+            Returns: tuple[ pins (board position -> set of board positions the pinned piece may move to), checkers (list of board positions), check_squares (set of board positions that capture or block a single check, None if not in check) ]
         """
-        piece_str = self.utils.get_str_from_piece_type(board[rank_i_old * self.board.files + file_i_old], self.board.piece_numbers, True)
-        king_new_rank, king_new_file = (king_rank, king_file) if piece_str != "K" else (rank_i_new, file_i_new)
-        if self.check_all_moves_for_check_fast(king_rank, king_file, king_is_white, board):
-            if self.filter_related_position_fast(king_rank, king_file, rank_i_old, file_i_old):
-                new_board = self.base_moves.base_move(rank_i_old, file_i_old, rank_i_new, file_i_new, board)
-                return self.check_all_moves_for_check_fast(king_new_rank, king_new_file, king_is_white, new_board)
-            return True
-        else:
-            if self.filter_related_position_fast(king_rank, king_file, rank_i_new, file_i_new):
-                new_board = self.base_moves.base_move(rank_i_old, file_i_old, rank_i_new, file_i_new, board)
-                return self.check_all_moves_for_check_fast(king_new_rank, king_new_file, king_is_white, new_board)
-            return False
-    
-    def check_all_available_moves_fast(self, king_rank: int, king_file: int, king_is_white: bool, board: list) -> list:
-        """Checks all available moves for check. If a move causes a check, it is removed from the list of valid moves.
-
-            Returns: List of moves that do not cause check.
+        king_position = king_rank * self.board.files + king_file
+        tables = self.base_moves.tables.get_tables()
+        own_color = self.board.piece_numbers['WHITE'] if king_is_white else self.board.piece_numbers['BLACK']
+        pawn, knight, bishop, rook, queen, _ = self.utils.get_piece_table(self.board.piece_numbers)['team_codes'][not king_is_white]
+        pins = {}
+        checkers = []
+        check_squares = None
+
+        #Pawns and knights can give check but never pin
+        for _, _, board_position in tables['pawn_attacks'][king_is_white][king_position]:
+            if board[board_position] == pawn:
+                checkers.append(board_position)
+                check_squares = {board_position}
+        for _, _, board_position in tables['knight'][king_position]:
+            if board[board_position] == knight:
+                checkers.append(board_position)
+                check_squares = {board_position}
+
+        #Sliders check through an open ray or pin the only piece of the king's team on it
+        for rays, slider in ((tables['bishop_rays'][king_position], bishop), (tables['rook_rays'][king_position], rook)):
+            for ray in rays:
+                pinned = None
+                for index, (_, _, board_position) in enumerate(ray):
+                    piece_value = board[board_position]
+                    if piece_value != 0:
+                        if piece_value == slider or piece_value == queen:
+                            if pinned is None:
+                                checkers.append(board_position)
+                                check_squares = set(target for _, _, target in ray[:index + 1])
+                            else:
+                                pins[pinned] = set(target for _, _, target in ray[:index + 1])
+                            break
+                        if int(piece_value / 10) == own_color and pinned is None:
+                            pinned = board_position
+                        else:
+                            break
+        return pins, checkers, check_squares
+
+    def calc_position_check_status(self, position: ChessPosition) -> int | None:
+        """Calculates the check status of the team to move from the position's king and piece lists.
+            Check is one attack test on the king, legal moves are only generated until the first one is found.
+
+            Returns: -2 / 2 checkmate, -1 / 1 check (negative when white is the team in check), 0 stalemate, None otherwise.
         """
-        pieces_list = self.get_piece_locations_fast(king_is_white, board)
-        valid_moves = []
-        for piece_r, piece_f in pieces_list:
-            moves_list = self.base_moves.get_base_moves(piece_r, piece_f, board)
-            for move_ro, move_fo, move_rf, move_ff in moves_list:
-                caused_check = self.check_move_causes_check_fast(king_rank, king_file, king_is_white, move_ro, move_fo, move_rf, move_ff, board)
-                if caused_check is False:
-                    valid_moves.append((move_ro, move_fo, move_rf, move_ff))
-        return valid_moves
-    
-    def calc_check_status_fast(self, board: list, whites_turn: bool) -> int | None:
-        if whites_turn:
-            king_value = self.utils.get_piece_number_from_str('K', self.board.piece_numbers)
-            king_pos = self.get_king_position_fast(king_value, True, board)
-            if king_pos is not None:
-                white_moves = self.check_all_available_moves_fast(king_pos[0], king_pos[1], True, board)
-                if self.check_all_moves_for_check_fast(king_pos[0], king_pos[1], True, board):
-                    if len(white_moves) == 0:
-                        return -2
-                    else:
-                        return -1
-                elif len(white_moves) == 0:
-                    return 0
-                else:
-                    return None
-        else:
-            king_value = self.utils.get_piece_number_from_str('k', self.board.piece_numbers)
-            king_pos = self.get_king_position_fast(king_value, False, board)
-            if king_pos is not None:
-                black_moves = self.check_all_available_moves_fast(king_pos[0], king_pos[1], False, board)
-                if self.check_all_moves_for_check_fast(king_pos[0], king_pos[1], False, board):
-                    if len(black_moves) == 0:
-                        return 2
-                    else:
-                        return 1
-                elif len(black_moves) == 0:
-                    return 0
-                else:
-                    return None
-        print("WARNING: King was not found.")
-        return None
+        king_position = position.kings[position.whites_turn]
+        if king_position is None:
+            print("WARNING: King was not found.")
+            return None
+        king_rank, king_file = divmod(king_position, self.board.files)
+        in_check = self.is_square_attacked(king_rank, king_file, not position.whites_turn, position.board)
+        has_moves = self.moves.has_legal_move(position)
+        sign = -1 if position.whites_turn else 1
+        if in_check:
+            return sign if has_moves else 2 * sign
+        return None if has_moves else 0
+
+    def calc_check_status_fast(self, board: list, whites_turn: bool, castle_avail: str = "-", en_passant: str = "-") -> int | None:
+        """Calculates the check status of the team to move on a bare board. The board is read into a position so the
+            game uses the same legal move generator as the search, castle availability and en passant included.
+
+            Returns: -2 / 2 checkmate, -1 / 1 check (negative when white is the team in check), 0 stalemate, None otherwise.
+        """
+        position = ChessPosition(board, whites_turn, castle_avail, en_passant)
+        return self.calc_position_check_status(position.set_piece_lists(self.board.piece_numbers))
     
     def get_check_status_str(self, check_status: int) -> str:
         """Calculates check status of the game.
@@ -336,7 +293,7 @@ class ChessCheck:
         elif check_status == 2:
             return "White Checkmate"
 
-    def calc_check_status_str(self, board: list, whites_turn: bool) -> str:
+    def calc_check_status_str(self, board: list, whites_turn: bool, castle_avail: str = "-", en_passant: str = "-") -> str:
         """Calculates check status of the game.
 
             This includes:
@@ -347,7 +304,7 @@ class ChessCheck:
             
             Return str of the check status
         """
-        return self.get_check_status_str(self.calc_check_status_fast(board, whites_turn))
+        return self.get_check_status_str(self.calc_check_status_fast(board, whites_turn, castle_avail, en_passant))
     
 
 
@@ -0,0 +1,139 @@
+"""
+
+    Incremental material and piece-square evaluation
+
+        material    white's material minus black's material, kings not counted, in piece_scores units
+        psq         white's piece-square bonuses minus black's, in 1 / PSQ_SCALE of a piece_scores unit
+
+        Both terms are set once per position by GlobalChess and kept up to date by make_move and unmake_move from the
+        pieces a move lifts, drops, captures and promotes, so evaluating a position does not scan the board.
+        With debug on every evaluation is checked against a full recomputation.
+
+        Piece-square tables are built from the board geometry for white and mirrored for black:
+
+            PAWN      bonus per rank advanced and for the center files
+            KNIGHT    bonus for centrality, large penalty on the rim
+            BISHOP    smaller bonus for centrality
+            ROOK      bonus on the opponent's second rank
+            QUEEN     small bonus for centrality
+            KING      stay on the back rank and off the center files
+
+"""
+from .chess_utils import ChessUtils
+from .chess_board import ChessBoard
+from .chess_score import ChessScore
+from .chess_position import ChessPosition
+
+#Piece-square bonuses are integers so incremental updates never drift from the full recomputation
+PSQ_SCALE = 100
+PSQ_PAWN_ADVANCE = 5
+PSQ_PAWN_CENTER = 2
+PSQ_KNIGHT_CENTER = 4
+PSQ_BISHOP_CENTER = 2
+PSQ_ROOK_SEVENTH = 20
+PSQ_QUEEN_CENTER = 1
+PSQ_KING_ADVANCE = 10
+PSQ_KING_CENTER = 3
+
+class ChessEval:
+    #Piece-square tables per (ranks, files, piece numbers), shared by every instance
+    _psq_cache = {}
+
+    def __init__(self, utils: ChessUtils, board: ChessBoard, score: ChessScore, debug: bool = False, *args, **kwargs) -> None:
+        self.utils = utils
+        self.board = board
+        self.score = score
+        self.debug = debug
+
+        #Signed tables and the score table and piece_numbers dict they were built from
+        self._tables_key = None
+        self._tables = None
+
+    def _build_psq(self, board_ranks: int, board_files: int) -> list:
+        """Builds the signed piece-square table of every piece code for a board geometry.
+
+            Returns: List per piece code of a list per board position, positive for white pieces and negative for black.
+        """
+        piece_table = self.utils.get_piece_table(self.board.piece_numbers)
+        psq = [[0] * (board_ranks * board_files) for _ in piece_table['letters']]
+        for is_white in (True, False):
+            pawn, knight, bishop, rook, queen, king = piece_table['team_codes'][is_white]
+            sign = 1 if is_white else -1
+            for board_position in range(board_ranks * board_files):
+                rank_i, file_i = divmod(board_position, board_files)
+
+                #Ranks advanced from the team's back rank, rank index 0 is black's back rank
+                advance = board_ranks - 1 - rank_i if is_white else rank_i
+                file_center = board_files - 1 - abs(2 * file_i - (board_files - 1))
+                rank_center = board_ranks - 1 - abs(2 * advance - (board_ranks - 1))
+                center = file_center + rank_center
+                edge_penalty = (board_files + board_ranks - 2) // 2
+
+                psq[pawn][board_position] = sign * (advance * PSQ_PAWN_ADVANCE + file_center * PSQ_PAWN_CENTER)
+                psq[knight][board_position] = sign * (center - edge_penalty) * PSQ_KNIGHT_CENTER
+                psq[bishop][board_position] = sign * (center - edge_penalty) * PSQ_BISHOP_CENTER
+                psq[rook][board_position] = sign * (PSQ_ROOK_SEVENTH if advance == board_ranks - 2 else 0)
+                psq[queen][board_position] = sign * (center - edge_penalty) * PSQ_QUEEN_CENTER
+                psq[king][board_position] = -sign * (advance * PSQ_KING_ADVANCE + file_center * PSQ_KING_CENTER)
+        return psq
+
+    def get_tables(self) -> dict:
+        """Get the signed material and piece-square tables. They are rebuilt only when piece_scores, piece_numbers or the geometry change.
+
+            Returns: dict[  "material" (piece code -> signed value)    "psq" (piece code -> list per board position)    ]
+        """
+        score_table = self.score.get_score_table()
+        if (self._tables_key is None or self._tables_key[0] is not score_table or self._tables_key[1] is not self.board.piece_numbers
+                or self._tables_key[2:] != (self.board.ranks, self.board.files)):
+            is_white_table = self.utils.get_piece_table(self.board.piece_numbers)['is_white']
+            material = [value if is_white_table[code] else -value for code, value in enumerate(score_table['values'])]
+            psq_key = (self.board.ranks, self.board.files, tuple(sorted(self.board.piece_numbers.items())))
+            psq = ChessEval._psq_cache.get(psq_key)
+            if psq is None:
+                psq = self._build_psq(self.board.ranks, self.board.files)
+                ChessEval._psq_cache[psq_key] = psq
+            self._tables = {"material": material, "psq": psq}
+            self._tables_key = (score_table, self.board.piece_numbers, self.board.ranks, self.board.files)
+        return self._tables
+
+    def calc_material(self, board: list) -> int:
+        """Calculates the material term from scratch.
+
+            Returns: White's material minus black's.
+        """
+        material = self.get_tables()['material']
+        return sum(material[piece_value] for piece_value in board if piece_value != 0)
+
+    def calc_psq(self, board: list) -> int:
+        """Calculates the piece-square term from scratch.
+
+            Returns: White's piece-square bonuses minus black's, in 1 / PSQ_SCALE units.
+        """
+        psq = self.get_tables()['psq']
+        return sum(psq[piece_value][board_position] for board_position, piece_value in enumerate(board) if piece_value != 0)
+
+    def set_position_eval(self, position: ChessPosition) -> ChessPosition:
+        """Calculates both terms of the position from scratch.
+
+            Returns: The position for chaining
+        """
+        position.material = self.calc_material(position.board)
+        position.psq = self.calc_psq(position.board)
+        return position
+
+    def check_position_eval(self, position: ChessPosition) -> bool:
+        """Debug cross-check of the incremental terms against a full recomputation.
+
+            Returns: True if both terms match.
+        """
+        return position.material == self.calc_material(position.board) and position.psq == self.calc_psq(position.board)
+
+    def evaluate(self, position: ChessPosition) -> float:
+        """Static evaluation of the position from the incremental terms.
+
+            Returns: Score from white's side in piece_scores units.
+        """
+        if self.debug and not self.check_position_eval(position):
+            raise ValueError(f"Incremental evaluation {position.material} {position.psq} does not match the board "
+                             f"{self.calc_material(position.board)} {self.calc_psq(position.board)}")
+        return position.material + position.psq / PSQ_SCALE
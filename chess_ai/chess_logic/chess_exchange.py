@@ -0,0 +1,142 @@
+"""
+
+    Capture ordering and static exchange evaluation
+
+        MVV-LVA    most valuable victim, least valuable attacker: victim value * MVV_LVA_VICTIM_WEIGHT - attacker value
+        SEE        material won or lost by the side to move if both teams keep recapturing on the target square
+                   with their least valuable attacker, either side may stop capturing when it would lose material
+
+"""
+from .chess_utils import ChessUtils
+from .chess_board import ChessBoard
+from .chess_score import ChessScore
+from .chess_tables import ChessTables
+from .chess_move_codes import MOVE_SQUARE_MASK, MOVE_TO_SHIFT, MOVE_PROMOTION_SHIFT, MOVE_PROMOTION_MASK, MOVE_EN_PASSANT
+
+#Larger than any attacker value so the victim always decides the order first
+MVV_LVA_VICTIM_WEIGHT = 128
+
+class ChessExchange:
+    def __init__(self, utils: ChessUtils, board: ChessBoard, score: ChessScore, tables: ChessTables = None, *args, **kwargs) -> None:
+        self.utils = utils
+        self.board = board
+        self.score = score
+        self.tables = tables if tables is not None else ChessTables(board)
+
+    def get_victim_value(self, board: list, move: int) -> int:
+        """Get the value of the piece a move captures. En passant captures a pawn that is not on the target square.
+
+            Returns: Material value of the captured piece, 0 if the move is not a capture.
+        """
+        values = self.score.get_score_table()['values_king']
+        if move & MOVE_EN_PASSANT:
+            return values[self.utils.get_piece_table(self.board.piece_numbers)['team_codes'][True][0]]
+        return values[board[(move >> MOVE_TO_SHIFT) & MOVE_SQUARE_MASK]]
+
+    def calc_mvv_lva(self, board: list, move: int) -> int:
+        """Scores a capture by most valuable victim, then least valuable attacker.
+
+            Returns: MVV-LVA score, higher is searched first.
+        """
+        attacker_value = self.score.get_score_table()['values_king'][board[move & MOVE_SQUARE_MASK]]
+        return self.get_victim_value(board, move) * MVV_LVA_VICTIM_WEIGHT - attacker_value
+
+    def is_losing_capture(self, board: list, move: int) -> bool:
+        """Checks if a capture or promotion loses material. SEE only runs when the attacker is worth more than the victim,
+            otherwise even an immediate recapture leaves the exchange at least even.
+
+            Returns: True if SEE of the move is negative.
+        """
+        attacker_value = self.score.get_score_table()['values_king'][board[move & MOVE_SQUARE_MASK]]
+        if attacker_value <= self.get_victim_value(board, move):
+            return False
+        return self.calc_see(board, move) < 0
+
+    def get_least_valuable_attacker(self, board_position: int, by_white: bool, board: list) -> int | None:
+        """Finds the least valuable piece of team by_white attacking board_position. Only the first piece on each ray attacks,
+            so removing an attacker from the board uncovers the slider behind it.
+
+            Returns: Board position of the attacker or None if the square is not attacked.
+        """
+        tables = self.tables.get_tables()
+        pawn, knight, bishop, rook, queen, king = self.utils.get_piece_table(self.board.piece_numbers)['team_codes'][by_white]
+
+        for _, _, target in tables['pawn_attacks'][not by_white][board_position]:
+            if board[target] == pawn:
+                return target
+        for _, _, target in tables['knight'][board_position]:
+            if board[target] == knight:
+                return target
+
+        #First piece on every ray, then pick the cheapest slider
+        queen_target = None
+        for ray in tables['bishop_rays'][board_position]:
+            for _, _, target in ray:
+                piece_value = board[target]
+                if piece_value != 0:
+                    if piece_value == bishop:
+                        return target
+                    if piece_value == queen:
+                        queen_target = target
+                    break
+        rook_target = None
+        for ray in tables['rook_rays'][board_position]:
+            for _, _, target in ray:
+                piece_value = board[target]
+                if piece_value != 0:
+                    if piece_value == rook:
+                        rook_target = target
+                    elif piece_value == queen:
+                        queen_target = target
+                    break
+        if rook_target is not None:
+            return rook_target
+        if queen_target is not None:
+            return queen_target
+
+        for _, _, target in tables['king'][board_position]:
+            if board[target] == king:
+                return target
+        return None
+
+    def calc_see(self, board: list, move: int) -> int:
+        """Static exchange evaluation of a capture or promotion. Pins and checks are ignored.
+
+            Returns: Material the moving side wins (positive) or loses (negative) on the target square.
+        """
+        values = self.score.get_score_table()['values_king']
+        is_white_table = self.utils.get_piece_table(self.board.piece_numbers)['is_white']
+        board = board.copy()
+        from_position = move & MOVE_SQUARE_MASK
+        to_position = (move >> MOVE_TO_SHIFT) & MOVE_SQUARE_MASK
+
+        #First capture, a promoting pawn lands as the promoted piece
+        piece_value = board[from_position]
+        gain = [self.get_victim_value(board, move)]
+        promotion = (move >> MOVE_PROMOTION_SHIFT) & MOVE_PROMOTION_MASK
+        if promotion != 0:
+            promoted_value = piece_value - piece_value % 10 + promotion
+            gain[0] += values[promoted_value] - values[piece_value]
+            piece_value = promoted_value
+        if move & MOVE_EN_PASSANT:
+            board[from_position - from_position % self.board.files + to_position % self.board.files] = 0
+        board[from_position] = 0
+        board[to_position] = piece_value
+        by_white = not is_white_table[piece_value]
+
+        #Swap list, each entry is the gain of the side that just captured if the other side stops here
+        while True:
+            attacker_position = self.get_least_valuable_attacker(to_position, by_white, board)
+            if attacker_position is None:
+                break
+            gain.append(values[board[to_position]] - gain[-1])
+            if max(-gain[-2], gain[-1]) < 0:
+                break
+            board[to_position] = board[attacker_position]
+            board[attacker_position] = 0
+            by_white = not by_white
+
+        #Either side may stop capturing, fold the swap list back to the first capture
+        for index in range(len(gain) - 1, 0, -1):
+            gain[index - 1] = -max(-gain[index - 1], gain[index])
+        return gain[0]
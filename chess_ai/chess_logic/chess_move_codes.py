@@ -0,0 +1,98 @@
+"""
+
+    Packed integer move codes
+
+        bits 0-7     board position the piece moves from (rank_i * files + file_i)
+        bits 8-15    board position the piece moves to
+        bits 16-19   piece type promoted to (PIECE_NUMBERS value, 0 if not a promotion)
+        bit 20       capture
+        bit 21       en passant
+        bit 22       castle
+
+    Boards up to 256 squares fit in the position fields.
+
+"""
+from .chess_utils import ChessUtils
+from .chess_board import ChessBoard
+
+MOVE_SQUARE_MASK = 0xFF
+MOVE_TO_SHIFT = 8
+MOVE_PROMOTION_SHIFT = 16
+MOVE_PROMOTION_MASK = 0xF
+MOVE_CAPTURE = 1 << 20
+MOVE_EN_PASSANT = 1 << 21
+MOVE_CASTLE = 1 << 22
+
+class ChessMoveCodes:
+    def __init__(self, utils: ChessUtils, board: ChessBoard, *args, **kwargs) -> None:
+        self.utils = utils
+        self.board = board
+
+    def encode(self, rank_i_old: int, file_i_old: int, rank_i_new: int, file_i_new: int, promotion: str = "", flags: int = 0) -> int:
+        """Packs a move into a move code. promotion is the letter of the piece to promote to ('Q', 'R', 'B', 'N') or "".
+
+            Returns: Move code.
+        """
+        move = (rank_i_old * self.board.files + file_i_old) | (rank_i_new * self.board.files + file_i_new) << MOVE_TO_SHIFT | flags
+        if promotion != "":
+            move |= (self.utils.get_piece_number_from_str(promotion.upper(), self.board.piece_numbers) % 10) << MOVE_PROMOTION_SHIFT
+        return move
+
+    def encode_from_board(self, rank_i_old: int, file_i_old: int, rank_i_new: int, file_i_new: int, board: list, promotion: str = "Q") -> int:
+        """Packs a move into a move code, reading the board before the move to set the capture, en passant, castle and promotion fields.
+
+            Returns: Move code.
+        """
+        piece_value = board[rank_i_old * self.board.files + file_i_old]
+        captured_value = board[rank_i_new * self.board.files + file_i_new]
+        flags = MOVE_CAPTURE if captured_value != 0 else 0
+        promotion_str = ""
+        if piece_value % 10 == self.board.piece_numbers['PAWN']:
+            if rank_i_new == 0 or rank_i_new == self.board.ranks - 1:
+                promotion_str = promotion
+            elif file_i_new != file_i_old and captured_value == 0:
+                flags |= MOVE_CAPTURE | MOVE_EN_PASSANT
+        elif piece_value % 10 == self.board.piece_numbers['KING'] and abs(file_i_new - file_i_old) == 2:
+            flags |= MOVE_CASTLE
+        return self.encode(rank_i_old, file_i_old, rank_i_new, file_i_new, promotion_str, flags)
+
+    def decode(self, move: int) -> tuple:
+        """Unpacks the positions of a move code.
+
+            Returns: tuple[ rank_i_old, file_i_old, rank_i_new, file_i_new ]
+        """
+        rank_i_old, file_i_old = divmod(move & MOVE_SQUARE_MASK, self.board.files)
+        rank_i_new, file_i_new = divmod((move >> MOVE_TO_SHIFT) & MOVE_SQUARE_MASK, self.board.files)
+        return rank_i_old, file_i_old, rank_i_new, file_i_new
+
+    def get_promotion_str(self, move: int) -> str:
+        """Get the letter of the piece the move promotes to.
+
+            Returns: Uppercase letter ('Q', 'R', 'B', 'N') or "" if the move is not a promotion.
+        """
+        promotion = (move >> MOVE_PROMOTION_SHIFT) & MOVE_PROMOTION_MASK
+        if promotion == 0:
+            return ""
+        return self.utils.get_str_from_piece_type(promotion, self.board.piece_numbers, True)
+
+    def to_str(self, move: int) -> str:
+        """Get the coordinate string of a move code, ex: e2e4 or a7a8n.
+
+            Returns: Coordinate move string.
+        """
+        rank_i_old, file_i_old, rank_i_new, file_i_new = self.decode(move)
+        return (self.utils.get_file_from_number(file_i_old) + self.utils.get_rank_from_number(rank_i_old, self.board.ranks) +
+                self.utils.get_file_from_number(file_i_new) + self.utils.get_rank_from_number(rank_i_new, self.board.ranks) +
+                self.get_promotion_str(move).lower())
+
+    def from_str(self, move_str: str, board: list) -> int | None:
+        """Reads a coordinate string (e2e4, a7a8n) into a move code using the board before the move.
+
+            Returns: Move code or None if the string can not be read.
+        """
+        old_position = self.utils.get_position_from_rank_file(move_str[0:2], self.board.ranks)
+        new_position = self.utils.get_position_from_rank_file(move_str[2:4], self.board.ranks)
+        if old_position is None or new_position is None:
+            return None
+        promotion = move_str[4:5].upper() if len(move_str) > 4 else "Q"
+        return self.encode_from_board(old_position[0], old_position[1], new_position[0], new_position[1], board, promotion)
@@ -7,6 +7,11 @@ from .chess_castle import ChessCastle
 from .chess_enpassant import ChessEnpassant
 from .chess_promotion import ChessPromotion
 from .chess_score import ChessScore
+from .chess_bitboard import ChessBitboard
+from .chess_position import ChessPosition
+from .chess_zobrist import ChessZobrist
+from .chess_eval import ChessEval
+from .chess_move_codes import ChessMoveCodes, MOVE_SQUARE_MASK, MOVE_TO_SHIFT, MOVE_PROMOTION_SHIFT, MOVE_PROMOTION_MASK, MOVE_CAPTURE, MOVE_EN_PASSANT, MOVE_CASTLE
 
 class ChessMoves:
     def __init__(self, 
@@ -315,6 +320,10 @@ class ChessMovesNew:
                 enpassant: ChessEnpassant, 
                 promote: ChessPromotion, 
                 score: ChessScore,
+                bitboard: ChessBitboard = None,
+                codes: ChessMoveCodes = None,
+                zobrist: ChessZobrist = None,
+                evaluator: ChessEval = None,
         *args, **kwargs) -> None:
         self.utils = utils
         self.board = board
@@ -324,7 +333,12 @@ class ChessMovesNew:
         self.enpassant = enpassant
         self.promote = promote
         self.score = score
+        self.bitboard = bitboard
+        self.codes = codes if codes is not None else ChessMoveCodes(utils, board)
+        self.zobrist = zobrist if zobrist is not None else ChessZobrist(utils, board)
+        self.evaluator = evaluator if evaluator is not None else ChessEval(utils, board, score)
         self._valid_moves = []
+        self._valid_move_codes = set()
 
     def _advanced_move(self,
         rank_i_old: int, 
@@ -334,11 +348,17 @@ class ChessMovesNew:
         board: list,
         whites_turn: bool,
         castle_avail: str,
-        en_passant: str
+        en_passant: str,
+        promotion: str = "Q"
     ) -> tuple:
+        """Performs a move on a copy of the board. Accounts for promotions, castling and en passant.
+
+            Returns: tuple[ new_board, castle_str, en_passant_str, castle_bool, en_passant_bool, changed_squares (board positions the move changed) ]
+        """
         #Get position in list of old and new location
         board_position_old = rank_i_old * self.board.files + file_i_old
         board_position_new = rank_i_new * self.board.files + file_i_new
+        changed_squares = [board_position_old, board_position_new]
 
         #Get piece_type of moving piece
         piece_type = self.utils.get_str_from_piece_type(board[board_position_old], self.board.piece_numbers, True)
@@ -367,14 +387,15 @@ class ChessMovesNew:
 
             #Promote
             elif rank_i_new == promote_rank:
-                queen = 'Q' if whites_turn else 'q'
-                new_board[board_position_new] = self.utils.get_piece_number_from_str(queen, self.board.piece_numbers)
+                promotion = promotion.upper() if whites_turn else promotion.lower()
+                new_board[board_position_new] = self.utils.get_piece_number_from_str(promotion, self.board.piece_numbers)
 
             #Enpassant Execute
             elif rank_i_new == enpassant_rank and len(en_passant) == 2:
                 e_file_i = self.utils.get_number_from_file(en_passant[0])
                 if e_file_i == file_i_new:
                     new_board[rank_i_old * self.board.files + file_i_new] = 0
+                    changed_squares.append(rank_i_old * self.board.files + file_i_new)
                     en_passant_bool = True
 
         #Piece is King, check for castling
@@ -389,6 +410,7 @@ class ChessMovesNew:
                 rook_new_pos = rank_i_old * self.board.files + rook_i_new
                 new_board[rook_new_pos] = new_board[rook_old_pos]
                 new_board[rook_old_pos] = 0
+                changed_squares += [rook_old_pos, rook_new_pos]
                 castle_bool = True
             
             #Update castle availability
@@ -396,122 +418,443 @@ class ChessMovesNew:
                 castle_str = castle_str.replace("Q", "").replace("K", "")
             else:
                 castle_str = castle_str.replace("q", "").replace("k", "")
+
+        #Rook leaving or captured on its corner
+        if castle_str != "-":
+            castle_str = self._remove_castle_rights(castle_str, board_position_old)
+            castle_str = self._remove_castle_rights(castle_str, board_position_new)
             if castle_str == "":
                 castle_str = "-"
 
-        #Piece is Rook, update castling
-        elif piece_type == "R":
+        return new_board, castle_str, en_passant_str, castle_bool, en_passant_bool, changed_squares
 
-            #Update castle availability
-            if file_i_old == 0:
-                if whites_turn:
-                    castle_str = castle_str.replace("Q", "")
-                else:
-                    castle_str = castle_str.replace("q", "")
-            elif file_i_old == self.board.files - 1:
-                if whites_turn:
-                    castle_str = castle_str.replace("K", "")
+    def _remove_castle_rights(self, castle_str: str, board_position: int) -> str:
+        """Removes the castle availability tied to a rook's starting corner when a piece leaves or lands on that corner.
+
+            Returns: Updated castle availability str.
+        """
+        files = self.board.files
+        white_home = (self.board.ranks - 1) * files
+        if board_position == white_home + files - 1:
+            castle_str = castle_str.replace("K", "")
+        elif board_position == white_home:
+            castle_str = castle_str.replace("Q", "")
+        elif board_position == files - 1:
+            castle_str = castle_str.replace("k", "")
+        elif board_position == 0:
+            castle_str = castle_str.replace("q", "")
+        return castle_str
+
+    def make_move(self,
+        position: ChessPosition,
+        rank_i_old: int,
+        file_i_old: int,
+        rank_i_new: int,
+        file_i_new: int,
+        promotion: str = "Q"
+    ) -> ChessPosition:
+        """Performs a move in place on the position. Accounts for promotions, castling and en passant.
+
+            Returns: The position for chaining
+        """
+        return self.make_move_code(position, self.codes.encode_from_board(rank_i_old, file_i_old, rank_i_new, file_i_new, position.board, promotion))
+
+    def make_move_code(self, position: ChessPosition, move: int) -> ChessPosition:
+        """Performs a move code in place on the position. The promotion, castle and en passant fields of the code are trusted.
+            Pushes the captured piece, castle availability, en passant, half move clock, key and evaluation terms onto the undo stack.
+            The Zobrist key and the material and piece-square terms are updated from the squares the move touches.
+
+            Returns: The position for chaining
+        """
+        board = position.board
+        files = self.board.files
+        whites_turn = position.whites_turn
+        pawn, _, _, _, _, king = self.utils.get_piece_table(self.board.piece_numbers)['team_codes'][whites_turn]
+        board_position_old = move & MOVE_SQUARE_MASK
+        board_position_new = (move >> MOVE_TO_SHIFT) & MOVE_SQUARE_MASK
+        piece_value = board[board_position_old]
+        piece_type = piece_value % 10
+        captured_value = board[board_position_new]
+        captured_position = board_position_new
+        rook_old_pos, rook_new_pos = None, None
+        castle_str = position.castle_avail
+        en_passant_str = "-"
+
+        #Update Piece on board
+        board[board_position_new] = piece_value
+        board[board_position_old] = 0
+
+        #Piece is Pawn, check for double move, promotion or en passant
+        if piece_value == pawn:
+            promotion = (move >> MOVE_PROMOTION_SHIFT) & MOVE_PROMOTION_MASK
+            if abs(board_position_new - board_position_old) == 2 * files:
+                rank_i, file_i = divmod((board_position_old + board_position_new) >> 1, files)
+                en_passant_str = self.utils.get_file_from_number(file_i) + self.utils.get_rank_from_number(rank_i, self.board.ranks)
+            elif promotion != 0:
+                board[board_position_new] = piece_value - piece_type + promotion
+            elif move & MOVE_EN_PASSANT:
+                captured_position = board_position_old - board_position_old % files + board_position_new % files
+                captured_value = board[captured_position]
+                board[captured_position] = 0
+
+        #Piece is King, check for castling
+        elif piece_value == king:
+            if move & MOVE_CASTLE:
+                rank_start = board_position_old - board_position_old % files
+                if board_position_new < board_position_old:
+                    rook_old_pos, rook_new_pos = rank_start, board_position_new + 1
                 else:
-                    castle_str = castle_str.replace("q", "")
+                    rook_old_pos, rook_new_pos = rank_start + files - 1, board_position_new - 1
+                board[rook_new_pos] = board[rook_old_pos]
+                board[rook_old_pos] = 0
+            if whites_turn:
+                castle_str = castle_str.replace("Q", "").replace("K", "")
+            else:
+                castle_str = castle_str.replace("q", "").replace("k", "")
 
-        return new_board, castle_str, en_passant_str, castle_bool, en_passant_bool
-    
-    def _filter_moves_for_check(self, king_rank: int, king_file: int, move_list: list[tuple], whites_turn: bool, board: list) -> list:
-        valid_moves = []
-        for ro, fo, rf, ff in move_list:
-            if self.check.check_move_causes_check_fast(king_rank, king_file, whites_turn, ro, fo, rf, ff, board) is False:
-                valid_moves.append((ro, fo, rf, ff))
-        return valid_moves
-    
-    def get_valid_piece_moves(self, king_rank: int, king_file: int, rank_i_old: int, file_i_old: int, board: list, castle_avail: str, en_passant: str, piece_type: str, is_white: bool) -> list:
+        #Rook leaving or captured on its corner
+        if castle_str != "-":
+            castle_str = self._remove_castle_rights(castle_str, board_position_old)
+            castle_str = self._remove_castle_rights(castle_str, board_position_new)
+            if castle_str == "":
+                castle_str = "-"
+
+        #Update Zobrist key
+        zobrist_keys = self.zobrist.get_keys()
+        piece_keys = zobrist_keys['pieces']
+        key = position.key ^ zobrist_keys['black'] ^ piece_keys[piece_value][board_position_old] ^ piece_keys[board[board_position_new]][board_position_new]
+        if captured_value != 0:
+            key ^= piece_keys[captured_value][captured_position]
+        if rook_old_pos is not None:
+            key ^= piece_keys[board[rook_new_pos]][rook_old_pos] ^ piece_keys[board[rook_new_pos]][rook_new_pos]
+        if castle_str != position.castle_avail:
+            key ^= self.zobrist.get_castle_key(position.castle_avail) ^ self.zobrist.get_castle_key(castle_str)
+        if en_passant_str != position.en_passant:
+            key ^= self.zobrist.get_en_passant_key(position.en_passant) ^ self.zobrist.get_en_passant_key(en_passant_str)
+
+        #Save undo information then update state
+        position.undo_stack.append((
+            board_position_old,
+            board_position_new,
+            piece_value,
+            captured_value,
+            captured_position,
+            rook_old_pos,
+            rook_new_pos,
+            position.castle_avail,
+            position.en_passant,
+            position.half_move,
+            position.full_move,
+            position.key,
+            position.material,
+            position.psq
+        ))
+
+        #Update material and piece-square terms, a promoted pawn is dropped as the new piece
+        eval_tables = self.evaluator.get_tables()
+        material = eval_tables['material']
+        psq = eval_tables['psq']
+        dropped_value = board[board_position_new]
+        position.material += material[dropped_value] - material[piece_value] - material[captured_value]
+        position.psq += psq[dropped_value][board_position_new] - psq[piece_value][board_position_old] - psq[captured_value][captured_position]
+        if rook_old_pos is not None:
+            rook_value = board[rook_new_pos]
+            position.psq += psq[rook_value][rook_new_pos] - psq[rook_value][rook_old_pos]
+        if position.bitboards is not None:
+            self.bitboard.toggle_move(position.bitboards, whites_turn, piece_value, board_position_old, dropped_value, board_position_new,
+                                      captured_value, captured_position, board[rook_new_pos] if rook_old_pos is not None else 0, rook_old_pos, rook_new_pos)
+
+        #Update piece lists and king position
+        team_pieces = position.pieces[whites_turn]
+        team_pieces.discard(board_position_old)
+        team_pieces.add(board_position_new)
+        if captured_value != 0:
+            position.pieces[not whites_turn].discard(captured_position)
+        if rook_old_pos is not None:
+            team_pieces.discard(rook_old_pos)
+            team_pieces.add(rook_new_pos)
+        if piece_value == king:
+            position.kings[whites_turn] = board_position_new
+
+        position.castle_avail = castle_str
+        position.en_passant = en_passant_str
+        position.half_move = 0 if piece_value == pawn or captured_value != 0 else position.half_move + 1
+        position.full_move = position.full_move if whites_turn else position.full_move + 1
+        position.whites_turn = not whites_turn
+        position.key = key
+        return position
+
+    def unmake_move(self, position: ChessPosition) -> ChessPosition:
+        """Takes back the last move made on the position from the undo stack.
+
+            Returns: The position for chaining
+        """
+        (board_position_old,
+         board_position_new,
+         piece_value,
+         captured_value,
+         captured_position,
+         rook_old_pos,
+         rook_new_pos,
+         castle_avail,
+         en_passant,
+         half_move,
+         full_move,
+         key,
+         material,
+         psq) = position.undo_stack.pop()
+        board = position.board
+        whites_turn = not position.whites_turn
+
+        #Toggle the same bits make_move toggled, while the dropped piece and rook are still on their new squares
+        if position.bitboards is not None:
+            self.bitboard.toggle_move(position.bitboards, whites_turn, piece_value, board_position_old, board[board_position_new], board_position_new,
+                                      captured_value, captured_position, board[rook_new_pos] if rook_old_pos is not None else 0, rook_old_pos, rook_new_pos)
+
+        #Put pieces back
+        if rook_old_pos is not None:
+            board[rook_old_pos] = board[rook_new_pos]
+            board[rook_new_pos] = 0
+        board[board_position_new] = 0
+        board[captured_position] = captured_value
+        board[board_position_old] = piece_value
+
+        #Restore piece lists and king position
+        team_pieces = position.pieces[whites_turn]
+        team_pieces.discard(board_position_new)
+        team_pieces.add(board_position_old)
+        if captured_value != 0:
+            position.pieces[not whites_turn].add(captured_position)
+        if rook_old_pos is not None:
+            team_pieces.discard(rook_new_pos)
+            team_pieces.add(rook_old_pos)
+        if position.kings[whites_turn] == board_position_new:
+            position.kings[whites_turn] = board_position_old
+
+        #Restore state
+        position.castle_avail = castle_avail
+        position.en_passant = en_passant
+        position.half_move = half_move
+        position.full_move = full_move
+        position.whites_turn = whites_turn
+        position.key = key
+        position.material = material
+        position.psq = psq
+        return position
+
+    def make_null_move(self, position: ChessPosition) -> ChessPosition:
+        """Passes the turn without moving a piece, for null move pruning. En passant is cleared and the key updated.
+            Must be taken back with unmake_null_move.
+
+            Returns: The position for chaining
+        """
+        key = position.key ^ self.zobrist.get_keys()['black'] ^ self.zobrist.get_en_passant_key(position.en_passant)
+        position.undo_stack.append((position.en_passant, position.half_move, position.key))
+        position.en_passant = "-"
+        position.half_move += 1
+        position.whites_turn = not position.whites_turn
+        position.key = key
+        return position
+
+    def unmake_null_move(self, position: ChessPosition) -> ChessPosition:
+        """Takes back a null move made with make_null_move.
+
+            Returns: The position for chaining
+        """
+        position.en_passant, position.half_move, position.key = position.undo_stack.pop()
+        position.whites_turn = not position.whites_turn
+        return position
+
+    def _get_castle_moves(self, king_rank: int, king_file: int, is_white: bool, board: list, castle_avail: str) -> list:
+        """Get the castle moves of the king (king_rank, king_file). The king must not be in check when this is called.
+            The squares between king and rook must be open and the king may not pass through or land on an attacked square.
+
+            Returns: List of castle move codes.
+        """
         moves = []
-        if piece_type == "P":
-            #Get Base Moves
-            moves = self.base_move.check_pawn_moves(rank_i_old, file_i_old, board)
-            #Add En passant Move
-            if len(en_passant) == 2:
-                e_file = self.utils.get_number_from_file(en_passant[0])
-                e_rank = self.utils.get_number_from_rank(en_passant[1], self.board.ranks)
-                rank_diff = -1 if is_white else 1
-                if e_rank == rank_i_old - rank_diff:
-                    if e_file == file_i_old - 1:
-                        moves = moves + [(rank_i_old, file_i_old, rank_i_old - rank_diff, file_i_old - 1)]
-                    elif e_file == file_i_old + 1:
-                        moves = moves + [(rank_i_old, file_i_old, rank_i_old - rank_diff, file_i_old + 1)]
+        rook_value = self.utils.get_piece_number_from_str('R' if is_white else 'r', self.board.piece_numbers)
+        for side, rook_file, direction in (("K", self.board.files - 1, 1), ("Q", 0, -1)):
+            if castle_avail.find(side if is_white else side.lower()) < 0:
+                continue
+            if board[king_rank * self.board.files + rook_file] != rook_value:
+                continue
+
+            #Open all the way to the rook
+            file_i = king_file + direction
+            while file_i != rook_file and board[king_rank * self.board.files + file_i] == 0:
+                file_i += direction
+            if file_i != rook_file:
+                continue
+
+            #Not through or into check
+            if self.check.is_square_attacked(king_rank, king_file + direction, not is_white, board):
+                continue
+            if self.check.is_square_attacked(king_rank, king_file + 2 * direction, not is_white, board):
+                continue
+            king_position = king_rank * self.board.files + king_file
+            moves.append(king_position | (king_position + 2 * direction) << MOVE_TO_SHIFT | MOVE_CASTLE)
+        return moves
+
+    def iter_legal_move_codes(self, position: ChessPosition, tactical_only: bool = False):
+        """Yields the legal moves for the team to move in the position as move codes, king moves first.
+            With tactical_only only captures and promotions are yielded, quiet moves are dropped before they are tested.
+            Pins and checkers are found once per position, then non king moves are restricted to their pin ray and to
+            capturing or blocking a single check. King moves are tested against attacked squares. Only en passant is
+            made and taken back on the position to test it. Pawn moves onto the last rank are yielded once per promotion piece.
+            The board is whole at every yield, so the caller may stop early, ex: to only find out if a legal move exists.
+
+            Returns: Generator of legal move codes.
+        """
+        board = position.board
+        files = self.board.files
+        piece_numbers = self.board.piece_numbers
+        whites_turn = position.whites_turn
+        king_position = position.kings[whites_turn]
+        pins, checkers, check_squares = {}, [], None
+
+        if king_position is not None:
+            king_rank, king_file = divmod(king_position, files)
+            pins, checkers, check_squares = self.check.get_pins_and_checkers(king_rank, king_file, whites_turn, board)
+
+            #King moves, tested with the king lifted off the board so it does not block rays aimed at it
+            king_moves = self.base_move.check_king_moves(king_rank, king_file, board)
+            king_legal_moves = []
+            king_value = board[king_position]
+            board[king_position] = 0
+            for _, _, rf, ff in king_moves:
+                if tactical_only and board[rf * files + ff] == 0:
+                    continue
+                if not self.check.is_square_attacked(rf, ff, not whites_turn, board):
+                    board_position_new = rf * files + ff
+                    king_legal_moves.append(king_position | board_position_new << MOVE_TO_SHIFT | (MOVE_CAPTURE if board[board_position_new] != 0 else 0))
+            board[king_position] = king_value
+            yield from king_legal_moves
+
+            #Only the king can move out of double check
+            if len(checkers) > 1:
+                return
+            if len(checkers) == 0 and not tactical_only:
+                yield from self._get_castle_moves(king_rank, king_file, whites_turn, board, position.castle_avail)
+
+        #Get En passant square
+        e_rank, e_file = None, None
+        if len(position.en_passant) == 2:
+            e_rank, e_file = self.utils.get_position_from_rank_file(position.en_passant, self.board.ranks)
+        forward = -1 if whites_turn else 1
+        promote_rank = 0 if whites_turn else self.board.ranks - 1
+        promotions = [piece_numbers[piece_type] << MOVE_PROMOTION_SHIFT for piece_type in ('QUEEN', 'ROOK', 'BISHOP', 'KNIGHT')]
+
+        for board_position in sorted(position.pieces[whites_turn]):
+            if board_position == king_position:
+                continue
+            rank_i, file_i = divmod(board_position, files)
+            piece_function = self.base_move.get_piece_type_function(rank_i, file_i, board)
+            if piece_function is None:
+                continue
+            is_pawn = piece_function == self.base_move.check_pawn_moves
+            pin_squares = pins.get(board_position)
+            for _, _, rf, ff in piece_function(rank_i, file_i, board):
+                board_position_new = rf * files + ff
+                if tactical_only and board[board_position_new] == 0 and not (is_pawn and rf == promote_rank):
+                    continue
+                if check_squares is not None and board_position_new not in check_squares:
+                    continue
+                if pin_squares is not None and board_position_new not in pin_squares:
+                    continue
+                move = board_position | board_position_new << MOVE_TO_SHIFT | (MOVE_CAPTURE if board[board_position_new] != 0 else 0)
+                if is_pawn and rf == promote_rank:
+                    for promotion in promotions:
+                        yield move | promotion
+                else:
+                    yield move
 
-        elif piece_type == "K":
-            #Get Base Moves
-            moves = self.base_move.check_king_moves(rank_i_old, file_i_old, board)
-
-            #Add Castle Moves
-            if castle_avail.find('K' if is_white else 'k') >= 0:
-                file_i = file_i_old + 1
-                while file_i < self.board.files - 1:
-                    if board[rank_i_old * self.board.files + file_i] != 0:
-                        break
-                    if file_i == self.board.files - 2:
-                        moves = moves + [(rank_i_old, file_i_old, rank_i_old, file_i_old + 2)]
-                        break
-                    file_i += 1
-            if castle_avail.find('Q' if is_white else 'q') >= 0:
-                file_i = file_i_old - 1
-                while file_i >= 1:
-                    if board[rank_i_old * self.board.files + file_i] != 0:
-                        break
-                    if file_i == 1:
-                        moves = moves + [(rank_i_old, file_i_old, rank_i_old, file_i_old - 2)]
-                        break
-                    file_i -= 1
-
-        elif piece_type == "N":
-            #Get Base Moves
-            moves = self.base_move.check_knight_moves(rank_i_old, file_i_old, board)
-        elif piece_type == "B":
-            #Get Base Moves
-            moves = self.base_move.check_bishop_moves(rank_i_old, file_i_old, board)
-        elif piece_type == "R":
-            #Get Base Moves
-            moves = self.base_move.check_rook_moves(rank_i_old, file_i_old, board)
-        elif piece_type == "Q":
-            #Get Base Moves
-            moves = self.base_move.check_queen_moves(rank_i_old, file_i_old, board)
-        return self._filter_moves_for_check(king_rank, king_file, moves, is_white, board)
+            #En passant can uncover check along the rank, so make it and test the king
+            if is_pawn and e_rank == rank_i + forward and abs(e_file - file_i) == 1:
+                move = board_position | (e_rank * files + e_file) << MOVE_TO_SHIFT | MOVE_CAPTURE | MOVE_EN_PASSANT
+                self.make_move_code(position, move)
+                is_legal = king_position is None or not self.check.is_square_attacked(king_rank, king_file, not whites_turn, board)
+                self.unmake_move(position)
+                if is_legal:
+                    yield move
+
+    def get_legal_move_codes(self, position: ChessPosition) -> list:
+        """Get all legal moves for the team to move in the position as move codes. See iter_legal_move_codes.
+
+            Returns: List of all legal move codes.
+        """
+        return list(self.iter_legal_move_codes(position))
+
+    def get_tactical_move_codes(self, position: ChessPosition) -> list:
+        """Get the legal captures and promotions for the team to move in the position, ex: for quiescence search.
+
+            Returns: List of legal move codes that capture or promote.
+        """
+        if self.board.backend == "BITBOARD":
+            return [move for move in self.get_valid_position_moves(position) if move & MOVE_CAPTURE or (move >> MOVE_PROMOTION_SHIFT) & MOVE_PROMOTION_MASK != 0]
+        return list(self.iter_legal_move_codes(position, True))
+
+    def has_legal_move(self, position: ChessPosition) -> bool:
+        """Checks if the team to move has a legal move. With the LIST backend generation stops at the first legal move,
+            so only a mated or stalemated position is generated in full.
+
+            Returns: True if a legal move exists.
+        """
+        if self.board.backend == "BITBOARD":
+            return len(self.get_valid_position_moves(position)) > 0
+        return next(self.iter_legal_move_codes(position), None) is not None
+
+    def get_legal_moves(self, position: ChessPosition) -> list:
+        """Get all legal moves for the team to move in the position. Promotions are listed once.
+
+            Returns: List of all legal moves (rank_i_old, file_i_old, rank_i_new, file_i_new).
+        """
+        return self.decode_move_codes(self.get_legal_move_codes(position))
+
+    def decode_move_codes(self, move_codes: list) -> list:
+        """Converts move codes into move tuples, listing each promotion move once.
+
+            Returns: List of moves (rank_i_old, file_i_old, rank_i_new, file_i_new).
+        """
+        queen = self.board.piece_numbers['QUEEN']
+        moves = []
+        for move in move_codes:
+            promotion = (move >> MOVE_PROMOTION_SHIFT) & MOVE_PROMOTION_MASK
+            if promotion == 0 or promotion == queen:
+                moves.append(self.codes.decode(move))
+        return moves
 
     def get_valid_team_moves(self, whites_turn: bool, board: list, castle_avail: str, enpassant: str) -> list:
-        #Get King
-        king_value = self.utils.get_piece_number_from_str('K' if whites_turn else 'k', self.board.piece_numbers)
-        king_rank, king_file = self.check.get_king_position_fast(king_value, whites_turn, board)
+        """Get all legal moves for the team on the passed board.
 
-        #Set up and get all moves for team pieces
-        all_valid_moves = []
-        rank_i = 0
-        file_i = 0
-        while rank_i < self.board.ranks:
-            file_i = 0
-            while file_i < self.board.files:
-                piece_value = board[rank_i * self.board.files + file_i]
-                if piece_value != 0:
-                    piece_type = self.utils.get_str_from_piece_type(piece_value, self.board.piece_numbers, True)
-                    piece_color = self.utils.get_is_white_from_piece_number(piece_value, self.board.piece_numbers)
-                    if piece_color == whites_turn:
-                        all_valid_moves = all_valid_moves + self.get_valid_piece_moves(king_rank, king_file, rank_i, file_i, board, castle_avail, enpassant, piece_type, whites_turn)
-                file_i += 1
-            rank_i += 1
-        return all_valid_moves
+            Returns: List of all valid moves (rank_i_old, file_i_old, rank_i_new, file_i_new).
+        """
+        #Bitboard backend generates moves set wise
+        if self.board.backend == "BITBOARD":
+            bitboards = self.board.bitboards if board is self.board.board else None
+            return self.decode_move_codes(self.bitboard.get_valid_team_move_codes(whites_turn, board, castle_avail, enpassant, bitboards))
+
+        position = ChessPosition(board, whites_turn, castle_avail, enpassant)
+        return self.get_legal_moves(position.set_piece_lists(self.board.piece_numbers))
+
+    def get_valid_position_moves(self, position: ChessPosition) -> list:
+        """Get all legal move codes for the team to move in the position. Only the squares in the position's piece lists are visited.
+
+            Returns: List of all valid move codes.
+        """
+        if self.board.backend == "BITBOARD":
+            if position.bitboards is None:
+                position.bitboards = self.bitboard.from_board(position.board)
+            return self.bitboard.get_valid_team_move_codes(position.whites_turn, position.board, position.castle_avail, position.en_passant, position.bitboards)
+        return self.get_legal_move_codes(position)
     
     def update_valid_moves(self, rank_i_old: int, file_i_old: int, board: list, castle_avail: str, enpassant: str, whites_turn: bool) -> "ChessMoves":
         """Calculates new valid moves and updates valid_moves member.
 
             Returns: Self for chaining
         """
-        #Get King
-        king_value = self.utils.get_piece_number_from_str('K' if whites_turn else 'k', self.board.piece_numbers)
-        king_rank, king_file = self.check.get_king_position_fast(king_value, whites_turn, board)
-        piece_value = board[rank_i_old * self.board.files + file_i_old]
-        piece_type = self.utils.get_str_from_piece_type(piece_value, self.board.piece_numbers, True)
-
-        #Update Valid Moves
-        self._valid_moves = self.get_valid_piece_moves(king_rank, king_file, rank_i_old, file_i_old, board, castle_avail, enpassant, piece_type, whites_turn)
+        team_moves = self.get_valid_team_moves(whites_turn, board, castle_avail, enpassant)
+        self._valid_moves = [move for move in team_moves if move[0] == rank_i_old and move[1] == file_i_old]
+        self._valid_move_codes = set(self.codes.encode(*move) for move in self._valid_moves)
         return self
     
     def clear_valid_moves(self) -> "ChessMoves":
@@ -520,6 +863,7 @@ class ChessMovesNew:
             Returns: Self for chaining
         """
         self._valid_moves = []
+        self._valid_move_codes = set()
         return self
     
     def valid_moves_is_empty(self) -> bool:
@@ -536,9 +880,7 @@ class ChessMovesNew:
 
             Returns: True if exists, false if otherwise
         """
-        if self._valid_moves.count((rank_i_old, file_i_old, rank_i_new, file_i_new)) > 0:
-            return True
-        return False
+        return self.codes.encode(rank_i_old, file_i_old, rank_i_new, file_i_new) in self._valid_move_codes
     
     def get_valid_moves_list(self) -> list:
         """Get the list of valid moves.
@@ -557,7 +899,7 @@ class ChessMovesNew:
         castle_avail: str,
         en_passant: str,
     ) -> tuple:
-        new_board, castle_str, en_passant_str, castle_bool, en_passant_bool = self._advanced_move(
+        new_board, castle_str, en_passant_str, castle_bool, en_passant_bool, _ = self._advanced_move(
             rank_i_old, 
             file_i_old, 
             rank_i_new, 
@@ -580,7 +922,9 @@ class ChessMovesNew:
              castle_avail: str, 
              en_passant: str, 
              half_move: int, 
-             full_move: int) -> dict | None:
+             full_move: int,
+             promotion: str = "Q",
+             zobrist_key: int = 0) -> dict | None:
         """ Moves the piece on the passed board.
 
             Gets the new Move string.
@@ -589,9 +933,10 @@ class ChessMovesNew:
             Updates En Passant Availability
             Updates half moves.
             Updates full moves.
+            Updates Zobrist key from zobrist_key.
             Generates new FEN String.
 
-            Returns: dict[  "board"   "move_str"    "move_tuple"    "whites_turn"     "fen_string"   "castle_avail"    "en_passant"    "half_move"    "full_move"    ] or None if no move.
+            Returns: dict[  "board"   "move_str"    "move_tuple"    "whites_turn"     "fen_string"   "castle_avail"    "en_passant"    "half_move"    "full_move"    "zobrist_key"    ] or None if no move.
         """
         #Get Half Move
         captured = False
@@ -603,7 +948,7 @@ class ChessMovesNew:
             half_move_new += 1
 
         #Update Piece on board
-        new_board, castle_str, en_passant_str, castle_bool, en_passant_bool = self._advanced_move(rank_i_old, file_i_old, rank_i_new, file_i_new, board, whites_turn, castle_avail, en_passant)
+        new_board, castle_str, en_passant_str, castle_bool, en_passant_bool, changed_squares = self._advanced_move(rank_i_old, file_i_old, rank_i_new, file_i_new, board, whites_turn, castle_avail, en_passant, promotion)
         captured = True if en_passant_bool else captured
 
         #Get Full Move
@@ -636,7 +981,8 @@ class ChessMovesNew:
             "full_move": full_move_new,
             "castle_bool": castle_bool, 
             "en_passant_bool": en_passant_bool,
-            "captured": captured
+            "captured": captured,
+            "zobrist_key": self.zobrist.update_key(zobrist_key, board, new_board, changed_squares, castle_avail, castle_str, en_passant, en_passant_str)
         }
     
     def get_move_str(self, rank_i_old: int, file_i_old: int, rank_i_new: int, file_i_new: int, board: list, castled: bool, enpassant: bool, captured: bool, check_status: int) -> str:
@@ -703,4 +1049,33 @@ class ChessMovesNew:
                 best_score = new_score 
                 best_move = (ro, fo, rf, ff)
             branches += 1
-        return best_score, best_move, branches
\ No newline at end of file
+        return best_score, best_move, branches
+
+    def perft(self, position: ChessPosition, depth: int) -> int:
+        """Counts the leaf nodes of the legal move tree of the position to depth. Each promotion piece counts as its own move.
+
+            Returns: Number of leaf nodes.
+        """
+        if depth <= 0:
+            return 1
+        move_codes = self.get_valid_position_moves(position)
+        if depth == 1:
+            return len(move_codes)
+        nodes = 0
+        for move in move_codes:
+            self.make_move_code(position, move)
+            nodes += self.perft(position, depth - 1)
+            self.unmake_move(position)
+        return nodes
+
+    def divide(self, position: ChessPosition, depth: int) -> dict:
+        """Runs perft to depth - 1 below every legal move of the position.
+
+            Returns: dict[ coordinate move string -> number of leaf nodes ]
+        """
+        nodes = {}
+        for move in self.get_valid_position_moves(position):
+            self.make_move_code(position, move)
+            nodes[self.codes.to_str(move)] = self.perft(position, depth - 1)
+            self.unmake_move(position)
+        return nodes
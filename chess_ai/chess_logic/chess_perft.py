@@ -0,0 +1,147 @@
+"""
+
+    Perft positions and runner for checking move generation correctness and speed
+
+        Random playouts from the same positions check the incremental state of make_move and unmake_move:
+        after every move the Zobrist key must equal a fresh hash and the evaluation terms a full recomputation,
+        and unmaking every move must give back the starting position.
+
+"""
+import random
+import time
+
+from .global_chess import GlobalChess
+
+#Standard perft positions with their known node counts for depth 1, 2, 3...
+PERFT_POSITIONS = [
+    {
+        "name": "Start Position",
+        "fen": "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+        "nodes": [20, 400, 8902, 197281, 4865609]
+    },
+    {
+        "name": "Kiwipete",
+        "fen": "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+        "nodes": [48, 2039, 97862, 4085603]
+    },
+    {
+        "name": "En Passant",
+        "fen": "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+        "nodes": [14, 191, 2812, 43238, 674624]
+    },
+    {
+        "name": "Promotion",
+        "fen": "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+        "nodes": [6, 264, 9467, 422333]
+    },
+    {
+        "name": "Promotion Mirrored",
+        "fen": "r2q1rk1/pP1p2pp/Q4n2/bbp1p3/Np6/1B3NBn/pPPP1PPP/R3K2R b KQ - 0 1",
+        "nodes": [6, 264, 9467, 422333]
+    },
+    {
+        "name": "Promotion Check",
+        "fen": "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+        "nodes": [44, 1486, 62379, 2103487]
+    },
+]
+
+def run_perft(chess: GlobalChess, fen_string: str, depth: int) -> tuple:
+    """Runs perft on the FEN string to depth.
+
+        Returns: tuple[ nodes, seconds ]
+    """
+    position = chess.get_position_from_fen(fen_string)
+    start = time.perf_counter()
+    nodes = chess.moves.perft(position, depth)
+    return nodes, time.perf_counter() - start
+
+def run_perft_suite(chess: GlobalChess, max_depth: int, positions: list = PERFT_POSITIONS) -> bool:
+    """Runs every position to max_depth (or its deepest known count) and prints nodes and nodes/second per depth.
+
+        Returns: True if every node count matched, false if otherwise.
+    """
+    passed = True
+    total_nodes = 0
+    total_seconds = 0
+    for perft_position in positions:
+        for depth in range(1, min(max_depth, len(perft_position['nodes'])) + 1):
+            nodes, seconds = run_perft(chess, perft_position['fen'], depth)
+            expected = perft_position['nodes'][depth - 1]
+            total_nodes += nodes
+            total_seconds += seconds
+            result = "OK" if nodes == expected else f"FAIL (expected {expected})"
+            passed = passed and nodes == expected
+            print(f"{perft_position['name']} depth {depth}: {nodes} nodes in {seconds:.3f}s, {nodes / max(seconds, 1e-9):.0f} nodes/s {result}")
+    print(f"Total: {total_nodes} nodes in {total_seconds:.3f}s, {total_nodes / max(total_seconds, 1e-9):.0f} nodes/s")
+    return passed
+
+def run_divide(chess: GlobalChess, fen_string: str, depth: int) -> int:
+    """Prints the perft count below every legal move of the FEN string.
+
+        Returns: Total number of nodes.
+    """
+    position = chess.get_position_from_fen(fen_string)
+    divide = chess.moves.divide(position, depth)
+    for move_str, nodes in sorted(divide.items()):
+        print(f"{move_str}: {nodes}")
+    total = sum(divide.values())
+    print(f"Moves: {len(divide)}, Nodes: {total}")
+    return total
+
+def check_position_state(chess: GlobalChess, position) -> list:
+    """Compares the incremental key and evaluation terms of the position against a recomputation from the board.
+
+        Returns: List of mismatch descriptions, empty if the position is consistent.
+    """
+    errors = []
+    key = chess.zobrist.hash_position(position.board, position.whites_turn, position.castle_avail, position.en_passant)
+    if position.key != key:
+        errors.append(f"key {position.key:#x} != hash {key:#x}")
+    if not chess.evaluator.check_position_eval(position):
+        errors.append(f"eval {position.material} {position.psq} != full "
+                      f"{chess.evaluator.calc_material(position.board)} {chess.evaluator.calc_psq(position.board)}")
+    return errors
+
+def run_playouts(chess: GlobalChess, playouts: int, plies: int, seed: int = 0, positions: list = PERFT_POSITIONS) -> bool:
+    """Plays random legal moves from every position and checks its state after each move and after taking them all back.
+        The first mismatch of a playout is printed with the moves that led to it.
+
+        Returns: True if every position stayed consistent, false if otherwise.
+    """
+    rng = random.Random(seed)
+    passed = True
+    total_moves = 0
+    start = time.perf_counter()
+    for perft_position in positions:
+        failures = 0
+        moves_played = 0
+        for _ in range(playouts):
+            position = chess.get_position_from_fen(perft_position['fen'])
+            start_state = (position.board.copy(), position.castle_avail, position.en_passant, position.key, position.material, position.psq)
+            played = []
+            errors = []
+            for _ in range(plies):
+                moves = chess.moves.get_valid_position_moves(position)
+                if len(moves) == 0:
+                    break
+                move = rng.choice(moves)
+                chess.moves.make_move_code(position, move)
+                played.append(chess.codes.to_str(move))
+                errors = check_position_state(chess, position)
+                if len(errors) > 0:
+                    break
+            moves_played += len(played)
+            while len(errors) == 0 and len(position.undo_stack) > 0:
+                chess.moves.unmake_move(position)
+            if len(errors) == 0 and (position.board, position.castle_avail, position.en_passant, position.key, position.material, position.psq) != start_state:
+                errors.append("unmake did not restore the starting position")
+            if len(errors) > 0:
+                failures += 1
+                print(f"{perft_position['name']} after {' '.join(played)}: {', '.join(errors)}")
+        total_moves += moves_played
+        passed = passed and failures == 0
+        result = "OK" if failures == 0 else f"FAIL ({failures} of {playouts} playouts)"
+        print(f"{perft_position['name']}: {playouts} playouts, {moves_played} moves checked {result}")
+    print(f"Total: {total_moves} moves checked in {time.perf_counter() - start:.3f}s")
+    return passed
@@ -0,0 +1,62 @@
+
+class ChessPosition:
+    def __init__(self,
+                board: list = None,
+                whites_turn: bool = True,
+                castle_avail: str = 'KQkq',
+                en_passant: str = '-',
+                half_move: int = 0,
+                full_move: int = 1,
+        *args, **kwargs) -> None:
+        self.board = board
+        self.whites_turn = whites_turn
+        self.castle_avail = castle_avail if castle_avail is not None else '-'
+        self.en_passant = en_passant if en_passant is not None else '-'
+        self.half_move = int(half_move) if half_move is not None else 0
+        self.full_move = int(full_move) if full_move is not None else 1
+        self.undo_stack = []
+
+        #Zobrist key of the position, set by GlobalChess and kept up to date by make_move and unmake_move
+        self.key = 0
+
+        #Board positions of each team's pieces and kings, kept up to date by make_move and unmake_move
+        self.pieces = {True: set(), False: set()}
+        self.kings = {True: None, False: None}
+
+        #Material and piece-square evaluation terms, set by GlobalChess and kept up to date by make_move and unmake_move
+        self.material = 0
+        self.psq = 0
+
+        #Bitboards of the BITBOARD backend, built on the first move generation and kept up to date by make_move and unmake_move
+        self.bitboards = None
+
+    def set_piece_lists(self, piece_numbers: dict) -> "ChessPosition":
+        """Scans the board once to build the piece lists and king positions of both teams.
+
+            Returns: Self for chaining
+        """
+        self.pieces = {True: set(), False: set()}
+        self.kings = {True: None, False: None}
+        for board_position, piece_value in enumerate(self.board):
+            if piece_value == 0:
+                continue
+            is_white = int(piece_value / 10) == piece_numbers['WHITE']
+            self.pieces[is_white].add(board_position)
+            if piece_value % 10 == piece_numbers['KING']:
+                self.kings[is_white] = board_position
+        return self
+
+    def copy(self) -> "ChessPosition":
+        """Copies the board, state and piece lists into a new position. The undo stack is not copied.
+
+            Returns: New position.
+        """
+        position = ChessPosition(self.board.copy(), self.whites_turn, self.castle_avail, self.en_passant, self.half_move, self.full_move)
+        position.pieces = {True: self.pieces[True].copy(), False: self.pieces[False].copy()}
+        position.kings = self.kings.copy()
+        position.key = self.key
+        position.material = self.material
+        position.psq = self.psq
+        if self.bitboards is not None:
+            position.bitboards = {"pieces": self.bitboards['pieces'].copy(), "white": self.bitboards['white'], "black": self.bitboards['black'], "occupied": self.bitboards['occupied']}
+        return position
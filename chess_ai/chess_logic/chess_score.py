@@ -2,6 +2,7 @@
 from .chess_board import ChessBoard
 from .chess_utils import ChessUtils
 from .chess_check import ChessCheck
+from .chess_position import ChessPosition
 
 class ChessScore:
     def __init__(self, utils: ChessUtils, board: ChessBoard, check: ChessCheck, piece_scores: dict = None, *args, **kwargs) -> None:
@@ -12,68 +13,78 @@ class ChessScore:
         self.score = 0
         self.score_max = 0
 
+        #Material value lookups and the piece_scores and piece_numbers dicts they were built from
+        self._score_key = None
+        self._score_table = None
+
+    def get_score_table(self) -> dict:
+        """Get the material value of every piece code from piece_scores. It is rebuilt only when piece_scores or piece_numbers is replaced.
+
+            Returns: dict[  "values" (kings score 0)    "values_king"    ]
+        """
+        if self._score_key is None or self._score_key[0] is not self.piece_scores or self._score_key[1] is not self.board.piece_numbers:
+            piece_table = self.utils.get_piece_table(self.board.piece_numbers)
+            values = [0] * len(piece_table['letters'])
+            values_king = [0] * len(piece_table['letters'])
+            for is_white in (True, False):
+                for piece_type, code in zip(['PAWN', 'KNIGHT', 'BISHOP', 'ROOK', 'QUEEN', 'KING'], piece_table['team_codes'][is_white]):
+                    values[code] = self.piece_scores[piece_type] if piece_type != 'KING' else 0
+                    values_king[code] = self.piece_scores[piece_type]
+            self._score_table = {"values": values, "values_king": values_king}
+            self._score_key = (self.piece_scores, self.board.piece_numbers)
+        return self._score_table
+
     def calc_piece_score(self, piece_value: int) -> int:
-        piece_type = self.utils.get_str_from_piece_type(piece_value, self.board.piece_numbers, True)
-        if piece_type == "P":
-            return self.piece_scores['PAWN']
-        elif piece_type == "N":
-            return self.piece_scores['KNIGHT']
-        elif piece_type == "B":
-            return self.piece_scores['BISHOP']
-        elif piece_type == "R":
-            return self.piece_scores['ROOK']
-        elif piece_type == "Q":
-            return self.piece_scores['QUEEN']
-        return 0
+        return self.get_score_table()['values'][piece_value]
     
     def calc_piece_score_king(self, piece_value: int) -> int:
-        piece_type = self.utils.get_str_from_piece_type(piece_value, self.board.piece_numbers, True)
-        if piece_type == "P":
-            return self.piece_scores['PAWN']
-        elif piece_type == "N":
-            return self.piece_scores['KNIGHT']
-        elif piece_type == "B":
-            return self.piece_scores['BISHOP']
-        elif piece_type == "R":
-            return self.piece_scores['ROOK']
-        elif piece_type == "Q":
-            return self.piece_scores['QUEEN']
-        elif piece_type == "K": 
-            return self.piece_scores['KING']
-        return 0
+        return self.get_score_table()['values_king'][piece_value]
 
     def calc_team_score(self, board: list, is_white: bool) -> int:
-        count = 0
+        values = self.get_score_table()['values']
+        is_white_table = self.utils.get_piece_table(self.board.piece_numbers)['is_white']
         score = 0
-        while count < len(board):
-            piece_value = board[count]
-            count += 1
+        for piece_value in board:
             #Determine if location is a piece and that piece is the right color
-            if piece_value == 0 or self.utils.get_is_white_from_piece_number(piece_value, self.board.piece_numbers) != is_white:
-                continue
-            score = score + self.calc_piece_score(piece_value)
+            if piece_value != 0 and is_white_table[piece_value] == is_white:
+                score = score + values[piece_value]
         return score
     
+    def calc_material_score(self, board: list) -> int:
+        """Calculates white's material minus black's material in one pass over the board. Kings are not counted.
+
+            Returns: Material score from white's side.
+        """
+        values = self.get_score_table()['values']
+        is_white_table = self.utils.get_piece_table(self.board.piece_numbers)['is_white']
+        score = 0
+        for piece_value in board:
+            if piece_value != 0:
+                score = score + values[piece_value] if is_white_table[piece_value] else score - values[piece_value]
+        return score
+
     def update_max_score(self, board: list) -> None:
         white = self.calc_team_score(board, True)
         black = self.calc_team_score(board, False)
         self.score_max = white + black
     
-    def calc_game_score(self, board: list, whites_turn: bool) -> int:
-        check_status = self.check.calc_check_status_fast(board, whites_turn)
+    def calc_game_score(self, board: list, whites_turn: bool, position: ChessPosition = None) -> int:
+        #A searched position carries its material and king squares, a bare board is scanned once
+        if position is not None:
+            check_status = self.check.calc_position_check_status(position)
+            material = position.material
+        else:
+            check_status = self.check.calc_check_status_fast(board, whites_turn)
+            material = self.calc_material_score(board)
         if check_status is None:
-            white = self.calc_team_score(board, True)
-            black = self.calc_team_score(board, False)
-            return white - black
+            return material
         else:
             if abs(check_status) == 2:
                 sign = 1 if check_status > 0 else -1
                 return sign * self.piece_scores['CHECKMATE']
             if abs(check_status) == 1:
                 sign = 1 if check_status > 0 else -1
-                white = self.calc_team_score(board, True)
-                black = self.calc_team_score(board, False)
-                return white - black + sign * self.piece_scores['CHECK']
+                return material + sign * self.piece_scores['CHECK']
             else:
                 return 0
             
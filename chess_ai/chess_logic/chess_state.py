@@ -20,6 +20,7 @@ class ChessState:
         self.last_move_tuple = None
         self.game_ended = False
         self.max_half_moves = max_half_moves
+        self.zobrist_key = 0
 
     def update_from_move_dict(self, new_move: dict) -> "ChessState":
         self.whites_turn = new_move['whites_turn']
@@ -27,6 +28,7 @@ class ChessState:
         self.en_passant = new_move['en_passant']
         self.half_move = new_move['half_move']
         self.full_move = new_move['full_move']
+        self.zobrist_key = new_move['zobrist_key']
         return self
     
     def update_from_fen_list(self, new_fen: list) -> "ChessState":
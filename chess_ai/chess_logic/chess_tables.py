@@ -0,0 +1,84 @@
+"""
+
+    Precomputed attack and ray tables for a board geometry
+
+        Every entry is a list indexed by board position (rank_i * files + file_i) of target squares (rank_i, file_i, board_position),
+        so move generation and attack probes are lookups with no bounds checks.
+
+"""
+from .chess_board import ChessBoard
+
+KNIGHT_CHECKS = [(2,1), (1,2), (2,-1), (1,-2), (-2,1), (-1,2), (-2,-1), (-1,-2)]
+KING_CHECKS = [(1,1), (1,0), (1,-1), (0,1), (0,-1), (-1,1), (-1,0), (-1,-1)]
+BISHOP_CHECKS = [(1,1), (1,-1), (-1,1), (-1,-1)]
+ROOK_CHECKS = [(0,1), (0,-1), (1,0), (-1,0)]
+
+class ChessTables:
+    #Tables per (ranks, files), shared by every instance
+    _cache = {}
+
+    def __init__(self, board: ChessBoard, *args, **kwargs) -> None:
+        self.board = board
+
+    def _build_tables(self, board_ranks: int, board_files: int) -> dict:
+        """Builds the target and ray tables for a board geometry.
+
+            Returns: dict[  "knight"    "king"    "pawn_attacks"    "pawn_pushes"    "rays"    "bishop_rays"    "rook_rays"    "queen_rays"    ]
+        """
+        square_count = board_ranks * board_files
+        knight = []
+        king = []
+        pawn_attacks = {True: [], False: []}
+        pawn_pushes = {True: [], False: []}
+        rays = {direction: [] for direction in KING_CHECKS}
+        for square in range(square_count):
+            rank_i, file_i = divmod(square, board_files)
+            knight.append(self._get_targets(rank_i, file_i, KNIGHT_CHECKS, board_ranks, board_files))
+            king.append(self._get_targets(rank_i, file_i, KING_CHECKS, board_ranks, board_files))
+            pawn_attacks[True].append(self._get_targets(rank_i, file_i, [(-1,-1), (-1,1)], board_ranks, board_files))
+            pawn_attacks[False].append(self._get_targets(rank_i, file_i, [(1,-1), (1,1)], board_ranks, board_files))
+            pawn_pushes[True].append(self._get_targets(rank_i, file_i, [(-1,0)], board_ranks, board_files))
+            pawn_pushes[False].append(self._get_targets(rank_i, file_i, [(1,0)], board_ranks, board_files))
+
+            #Rays exclude the starting square and run to the edge of the board
+            for r_d, f_d in KING_CHECKS:
+                ray = []
+                r, f = rank_i + r_d, file_i + f_d
+                while r >= 0 and r < board_ranks and f >= 0 and f < board_files:
+                    ray.append((r, f, r * board_files + f))
+                    r, f = r + r_d, f + f_d
+                rays[(r_d, f_d)].append(ray)
+
+        #Non empty rays of each slider per square
+        bishop_rays = [[rays[direction][square] for direction in BISHOP_CHECKS if rays[direction][square]] for square in range(square_count)]
+        rook_rays = [[rays[direction][square] for direction in ROOK_CHECKS if rays[direction][square]] for square in range(square_count)]
+        return {
+            "knight": knight,
+            "king": king,
+            "pawn_attacks": pawn_attacks,
+            "pawn_pushes": pawn_pushes,
+            "rays": rays,
+            "bishop_rays": bishop_rays,
+            "rook_rays": rook_rays,
+            "queen_rays": [bishop_rays[square] + rook_rays[square] for square in range(square_count)]
+        }
+
+    def _get_targets(self, rank_i: int, file_i: int, checks: list, board_ranks: int, board_files: int) -> list:
+        targets = []
+        for r_d, f_d in checks:
+            r, f = rank_i + r_d, file_i + f_d
+            if r >= 0 and r < board_ranks and f >= 0 and f < board_files:
+                targets.append((r, f, r * board_files + f))
+        return targets
+
+    def get_tables(self) -> dict:
+        """Get the tables for the current board geometry. Tables are built once per (ranks, files) and cached.
+
+            Returns: dict of tables from _build_tables.
+        """
+        key = (self.board.ranks, self.board.files)
+        tables = ChessTables._cache.get(key)
+        if tables is None:
+            tables = self._build_tables(self.board.ranks, self.board.files)
+            ChessTables._cache[key] = tables
+        return tables
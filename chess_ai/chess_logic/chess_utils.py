@@ -1,8 +1,53 @@
-
-
 class ChessUtils:
     def __init__(self, *args, **kwargs) -> None:
-        pass
+        #Piece code lookup table and the piece_numbers dict it was built from
+        self._piece_numbers = None
+        self._piece_table = None
+
+    def _build_piece_table(self, piece_numbers: dict) -> dict:
+        """Builds lists indexed directly by piece code (piece_type + piece_color * 10) from piece_numbers.
+
+            Returns: dict[  "types"    "is_white"    "letters"    "type_letters"    "numbers"    "team_codes"    ]
+        """
+        piece_types = ['PAWN', 'KNIGHT', 'BISHOP', 'ROOK', 'QUEEN', 'KING']
+        type_letters = {True: [None] * 10, False: [None] * 10}
+        for piece_type, letter in zip(piece_types, "PNBRQK"):
+            type_letters[True][piece_numbers[piece_type]] = letter
+            type_letters[False][piece_numbers[piece_type]] = letter.lower()
+
+        code_count = max(piece_numbers['WHITE'], piece_numbers['BLACK']) * 10 + 10
+        types = [code % 10 for code in range(code_count)]
+        is_white = [int(code / 10) == piece_numbers['WHITE'] for code in range(code_count)]
+        letters = [None] * code_count
+        numbers = {}
+        for code in range(code_count):
+            if int(code / 10) in (piece_numbers['WHITE'], piece_numbers['BLACK']) and type_letters[True][code % 10] is not None:
+                letters[code] = type_letters[is_white[code]][code % 10]
+                numbers[letters[code]] = code
+        team_codes = {
+            True: tuple(piece_numbers[piece_type] + piece_numbers['WHITE'] * 10 for piece_type in piece_types),
+            False: tuple(piece_numbers[piece_type] + piece_numbers['BLACK'] * 10 for piece_type in piece_types)
+        }
+        return {
+            "types": types,
+            "is_white": is_white,
+            "letters": letters,
+            "type_letters": type_letters,
+            "numbers": numbers,
+            "team_codes": team_codes
+        }
+
+    def get_piece_table(self, piece_numbers: dict) -> dict:
+        """Get the piece code lookup table for piece_numbers. It is rebuilt only when a different piece_numbers dict is passed.
+
+            team_codes holds each team's piece numbers in the order PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING.
+
+            Returns: dict of lookups from _build_piece_table.
+        """
+        if piece_numbers is not self._piece_numbers:
+            self._piece_table = self._build_piece_table(piece_numbers)
+            self._piece_numbers = piece_numbers
+        return self._piece_table
 
     def get_piece_number_on_board(self, rank_i: int, file_i: int, board: list, board_files_count: int) -> int:
         """Get the piece number at board[rank_i * board_files_count + file_i] (rank_i, file_i) from the board list.
@@ -23,39 +68,14 @@ class ChessUtils:
 
             Returns: piece number of the indicated letter.
         """
-        if letter == 'p':
-            return piece_numbers['PAWN'] + piece_numbers['BLACK'] * 10
-        elif letter == 'n':
-            return piece_numbers['KNIGHT'] + piece_numbers['BLACK'] * 10
-        elif letter == 'b':
-            return piece_numbers['BISHOP'] + piece_numbers['BLACK'] * 10
-        elif letter == 'r':
-            return piece_numbers['ROOK'] + piece_numbers['BLACK'] * 10
-        elif letter == 'q':
-            return piece_numbers['QUEEN'] + piece_numbers['BLACK'] * 10
-        elif letter == 'k':
-            return piece_numbers['KING'] + piece_numbers['BLACK'] * 10
-        elif letter == 'P':
-            return piece_numbers['PAWN'] + piece_numbers['WHITE'] * 10
-        elif letter == 'N':
-            return piece_numbers['KNIGHT'] + piece_numbers['WHITE'] * 10
-        elif letter == 'B':
-            return piece_numbers['BISHOP'] + piece_numbers['WHITE'] * 10
-        elif letter == 'R':
-            return piece_numbers['ROOK'] + piece_numbers['WHITE'] * 10
-        elif letter == 'Q':
-            return piece_numbers['QUEEN'] + piece_numbers['WHITE'] * 10
-        elif letter == 'K':
-            return piece_numbers['KING'] + piece_numbers['WHITE'] * 10
-        else:
-            return 0
+        return self.get_piece_table(piece_numbers)['numbers'].get(letter, 0)
     
     def get_is_white_from_piece_number(self, piece_value: int, piece_numbers: dict) -> bool:
         """Get if the color of the piece value is white.
 
             Returns: True if piece is white, else False if piece is black
         """
-        return True if int(piece_value / 10) == piece_numbers['WHITE'] else False
+        return self.get_piece_table(piece_numbers)['is_white'][piece_value]
     
     def get_str_from_piece_type(self, piece_value: int, piece_numbers: dict, is_white: bool) -> str | None:
         """Get letter of piece type. Works for white (Uppercase) and black(Lowercase) from is_white input.
@@ -65,22 +85,7 @@ class ChessUtils:
 
             Returns: Letter of piece or None if piece does not exist.
         """
-        if piece_value % 10 == piece_numbers['NONE']:
-            return None
-        elif piece_value % 10 == piece_numbers['PAWN']:
-            return 'P' if is_white else 'p'
-        elif piece_value % 10 == piece_numbers['KNIGHT']:
-            return 'N' if is_white else 'n'
-        elif piece_value % 10 == piece_numbers['BISHOP']:
-            return 'B' if is_white else 'b'
-        elif piece_value % 10 == piece_numbers['ROOK']:
-            return 'R' if is_white else 'r'
-        elif piece_value % 10 == piece_numbers['QUEEN']:
-            return 'Q' if is_white else 'q'
-        elif piece_value % 10 == piece_numbers['KING']:
-            return 'K' if is_white else 'k'
-        else:
-            return None
+        return self.get_piece_table(piece_numbers)['type_letters'][is_white][piece_value % 10]
         
     def get_str_from_piece_number(self, piece_value: int, piece_numbers: dict) -> str | None:
         """Calculates the letter of piece type. Determines if piece is white then calls: get_str_from_piece_type.
@@ -91,13 +96,8 @@ class ChessUtils:
 
             Returns: Letter of piece or None if piece does not exist.
         """
-        if piece_value % 10 == piece_numbers['NONE']:
-            return None
-        if self.get_is_white_from_piece_number(piece_value, piece_numbers):
-            return self.get_str_from_piece_type(piece_value, piece_numbers, True)
-        else:
-            return self.get_str_from_piece_type(piece_value, piece_numbers, False)
-    
+        return self.get_piece_table(piece_numbers)['letters'][piece_value]
+
     def get_file_from_number(self, file_index: int, board_file_count: int = None, perspective: str = "WHITE") -> str:
         """Get the file letter from the file index.
 
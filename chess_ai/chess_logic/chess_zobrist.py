@@ -0,0 +1,112 @@
+"""
+
+    Zobrist hashing of chess positions
+
+        key = XOR of one random 64 bit number per (piece code, board position) on the board,
+              the side key when black is to move,
+              one key per castle availability letter (KQkq),
+              one key per en passant file.
+
+    Keys come from a fixed seed so every process builds the same numbers for the same geometry.
+
+"""
+import random
+
+from .chess_utils import ChessUtils
+from .chess_board import ChessBoard
+
+ZOBRIST_SEED = 20240601
+
+class ChessZobrist:
+    #Keys per (ranks, files, piece code count), shared by every instance
+    _cache = {}
+
+    def __init__(self, utils: ChessUtils, board: ChessBoard, *args, **kwargs) -> None:
+        self.utils = utils
+        self.board = board
+
+    def _build_keys(self, board_ranks: int, board_files: int, code_count: int) -> dict:
+        """Draws the random keys for a board geometry.
+
+            Returns: dict[  "pieces" (piece code -> list per board position)    "black"    "castle" (letter -> key)    "en_passant" (list per file)    "castle_strs" (cache of castle availability str -> key)    ]
+        """
+        rng = random.Random(ZOBRIST_SEED)
+        square_count = board_ranks * board_files
+        pieces = [[rng.getrandbits(64) for _ in range(square_count)] for _ in range(code_count)]
+        return {
+            "pieces": pieces,
+            "black": rng.getrandbits(64),
+            "castle": {letter: rng.getrandbits(64) for letter in "KQkq"},
+            "en_passant": [rng.getrandbits(64) for _ in range(board_files)],
+            "castle_strs": {}
+        }
+
+    def get_keys(self) -> dict:
+        """Get the keys for the current board geometry. Keys are drawn once per geometry and cached.
+
+            Returns: dict of keys from _build_keys.
+        """
+        code_count = len(self.utils.get_piece_table(self.board.piece_numbers)['letters'])
+        key = (self.board.ranks, self.board.files, code_count)
+        keys = ChessZobrist._cache.get(key)
+        if keys is None:
+            keys = self._build_keys(self.board.ranks, self.board.files, code_count)
+            ChessZobrist._cache[key] = keys
+        return keys
+
+    def get_castle_key(self, castle_avail: str) -> int:
+        """Get the combined key of a castle availability str. Combinations are cached by str.
+
+            Returns: Key of castle availability.
+        """
+        keys = self.get_keys()
+        castle_key = keys['castle_strs'].get(castle_avail)
+        if castle_key is None:
+            castle_key = 0
+            for letter in castle_avail or "":
+                castle_key ^= keys['castle'].get(letter, 0)
+            keys['castle_strs'][castle_avail] = castle_key
+        return castle_key
+
+    def get_en_passant_key(self, en_passant: str) -> int:
+        """Get the key of the en passant file, ex: e3.
+
+            Returns: Key of en passant file or 0 if there is no en passant.
+        """
+        if en_passant is None or len(en_passant) != 2:
+            return 0
+        return self.get_keys()['en_passant'][self.utils.get_number_from_file(en_passant[0])]
+
+    def hash_position(self, board: list, whites_turn: bool, castle_avail: str, en_passant: str) -> int:
+        """Calculates the key of a position from scratch.
+
+            Returns: 64 bit Zobrist key.
+        """
+        keys = self.get_keys()
+        piece_keys = keys['pieces']
+        key = 0
+        for board_position, piece_value in enumerate(board):
+            if piece_value != 0:
+                key ^= piece_keys[piece_value][board_position]
+        if not whites_turn:
+            key ^= keys['black']
+        return key ^ self.get_castle_key(castle_avail) ^ self.get_en_passant_key(en_passant)
+
+    def update_key(self, key: int, board_old: list, board_new: list, squares: list, castle_old: str, castle_new: str, en_passant_old: str, en_passant_new: str) -> int:
+        """Updates the key of a position for a move from board_old to board_new. Only the squares the move changed are rehashed,
+            the from and to squares plus the rook on castling and the pawn taken en passant.
+
+            Returns: 64 bit Zobrist key after the move.
+        """
+        keys = self.get_keys()
+        piece_keys = keys['pieces']
+        for board_position in squares:
+            piece_old = board_old[board_position]
+            piece_new = board_new[board_position]
+            if piece_old != 0:
+                key ^= piece_keys[piece_old][board_position]
+            if piece_new != 0:
+                key ^= piece_keys[piece_new][board_position]
+        key ^= keys['black']
+        key ^= self.get_castle_key(castle_old) ^ self.get_castle_key(castle_new)
+        return key ^ self.get_en_passant_key(en_passant_old) ^ self.get_en_passant_key(en_passant_new)
@@ -16,6 +16,13 @@ from .chess_castle import ChessCastle
 from .chess_enpassant import ChessEnpassant 
 from .chess_promotion import ChessPromotion
 from .chess_score import ChessScore
+from .chess_bitboard import ChessBitboard
+from .chess_position import ChessPosition
+from .chess_move_codes import ChessMoveCodes
+from .chess_tables import ChessTables
+from .chess_zobrist import ChessZobrist
+from .chess_exchange import ChessExchange
+from .chess_eval import ChessEval
 
 #Global Variable Class
 class GlobalChess:
@@ -25,24 +32,77 @@ class GlobalChess:
                  board: list =  [],
                  piece_numbers: dict = {},
                  piece_scores: dict = {},
+                 board_backend: str = "LIST",
     *args, **kwargs) -> None:
         
         #Attach Chess Objects
-        self.board = ChessBoard(board, board_ranks, board_files, piece_numbers)
+        self.board = ChessBoard(board, board_ranks, board_files, piece_numbers, board_backend)
         self.util = ChessUtils()
         self.history = ChessHistory()
         self.state = ChessState()
 
+        self.tables = ChessTables(self.board)
         self.promote = ChessPromotion(self.util, self.board)
-        self.base_moves = ChessBaseMoves(self.util, self.board)
+        self.base_moves = ChessBaseMoves(self.util, self.board, self.tables)
         self.enpassant = ChessEnpassant(self.util, self.board, self.base_moves)
         self.check = ChessCheck(self.util, self.board, self.base_moves)
         self.score = ChessScore(self.util, self.board, self.check, piece_scores)
         self.castle = ChessCastle(self.util, self.board, self.base_moves, self.check)
-        self.moves = ChessMovesNew(self.util, self.board, self.base_moves, self.check, self.castle, self.enpassant, self.promote, self.score)
+        self.bitboard = ChessBitboard(self.util, self.board, self.tables)
+        self.codes = ChessMoveCodes(self.util, self.board)
+        self.zobrist = ChessZobrist(self.util, self.board)
+        self.exchange = ChessExchange(self.util, self.board, self.score, self.tables)
+        self.evaluator = ChessEval(self.util, self.board, self.score)
+        self.moves = ChessMovesNew(self.util, self.board, self.base_moves, self.check, self.castle, self.enpassant, self.promote, self.score, self.bitboard, self.codes, self.zobrist, self.evaluator)
+        self.check.set_moves(self.moves)
+
+    def sync_backend(self) -> "GlobalChess":
+        """Rebuilds the bitboards from the board list when the BITBOARD backend is selected.
+
+            Returns: Self for chaining
+        """
+        if self.board.backend == "BITBOARD":
+            self.board.bitboards = self.bitboard.from_board(self.board.board)
+        else:
+            self.board.bitboards = None
+        return self
         
-    def move_piece(self, rank_i_old: int, file_i_old: int, rank_i_new: int, file_i_new: int) -> "GlobalChess":
-        """Move a piece on the chess board.
+    def update_zobrist_key(self) -> "GlobalChess":
+        """Hashes the current board and state from scratch into the state's Zobrist key.
+
+            Returns: Self for chaining
+        """
+        self.state.zobrist_key = self.zobrist.hash_position(self.board.board, self.state.whites_turn, self.state.castle_avail, self.state.en_passant)
+        return self
+
+    def get_position(self) -> ChessPosition:
+        """Copies the current board and state into a position that can be searched with make_move and unmake_move.
+
+            Returns: New position.
+        """
+        position = ChessPosition(
+            self.board.board.copy(),
+            self.state.whites_turn,
+            self.state.castle_avail,
+            self.state.en_passant,
+            self.state.half_move,
+            self.state.full_move
+        )
+        position.key = self.state.zobrist_key
+        return self.evaluator.set_position_eval(position.set_piece_lists(self.board.piece_numbers))
+
+    def get_position_from_fen(self, fen_string: str) -> ChessPosition:
+        """Reads a FEN string into a new position using the current board dimensions.
+
+            Returns: New position.
+        """
+        fen_data = self.util.convert_fen_to_board(fen_string, self.board.files, self.board.ranks, self.board.piece_numbers)
+        position = ChessPosition(fen_data[0], fen_data[1], fen_data[2], fen_data[3], fen_data[4], fen_data[5])
+        position.key = self.zobrist.hash_position(position.board, position.whites_turn, position.castle_avail, position.en_passant)
+        return self.evaluator.set_position_eval(position.set_piece_lists(self.board.piece_numbers))
+
+    def move_piece(self, rank_i_old: int, file_i_old: int, rank_i_new: int, file_i_new: int, promotion: str = "Q") -> "GlobalChess":
+        """Move a piece on the chess board. promotion is the piece letter a pawn reaching the last rank becomes.
             Updates History.
             Updates Board.
             Updates turn.
@@ -64,12 +124,15 @@ class GlobalChess:
                                    self.state.castle_avail, 
                                    self.state.en_passant,
                                    self.state.half_move,
-                                   self.state.full_move
+                                   self.state.full_move,
+                                   promotion,
+                                   self.state.zobrist_key
         )
         
         self.board.board = new_move['board']
+        self.sync_backend()
         self.state.update_from_move_dict(new_move)
-        self.state.check_status = self.check.calc_check_status_fast(self.board.board, self.state.whites_turn)
+        self.state.check_status = self.check.calc_check_status_fast(self.board.board, self.state.whites_turn, self.state.castle_avail, self.state.en_passant)
         self.state.check_status_str = self.check.get_check_status_str(self.state.check_status)
         new_move_str = self.moves.get_move_str(
             rank_i_old, 
@@ -100,10 +163,12 @@ class GlobalChess:
     def load_from_history(self, frame: dict) -> "GlobalChess":
         history_data = self.util.convert_fen_to_board(frame['fen_string'], self.board.files, self.board.ranks, self.board.piece_numbers)
         self.board.board = history_data[0]
+        self.sync_backend()
         self.state.update_from_fen_list(history_data)
+        self.update_zobrist_key()
         self.state.last_move_str = frame['last_move_str']
         self.state.last_move_tuple = frame['last_move_tuple']
-        self.state.check_status = self.check.calc_check_status_str(self.board.board, self.state.whites_turn)
+        self.state.check_status = self.check.calc_check_status_str(self.board.board, self.state.whites_turn, self.state.castle_avail, self.state.en_passant)
         
 
     def set_from_yaml(self, yaml_path: str) -> "GlobalChess":
@@ -115,16 +180,20 @@ class GlobalChess:
             self.board.files = settings['BOARD_FILES']
             self.board.ranks = settings['BOARD_RANKS']
             self.board.piece_numbers = settings['PIECE_NUMBERS']
+            self.board.backend = settings.get('BOARD_BACKEND', "LIST")
 
             #Get Chess State from FEN string
             fen_data = self.util.convert_fen_to_board(settings['BOARD'], self.board.files, self.board.ranks, self.board.piece_numbers)
             self.board.board = fen_data[0]
+            self.sync_backend()
             self.state.update_from_fen_list(fen_data)
+            self.update_zobrist_key()
             self.state.max_half_moves = settings['MAX_HALF_MOVES']
             self.history.pop_add({"last_move_str": "None", "last_move_tuple": None, "fen_string": settings['BOARD']})
 
             #Scores
             self.score.piece_scores = settings['PIECE_SCORES']
             self.score.update_max_score(self.board.board)
+            self.evaluator.debug = settings.get('EVAL_DEBUG', False)
 
         return self
\ No newline at end of file
@@ -27,6 +27,10 @@ class Environment:
         if pieces_dir is not None:
             self.piece_images = load_images(pieces_dir)
 
+    def close(self) -> None:
+        """Releases what the AI players started, call it when the game exits."""
+        self.ai.close_players()
+
     def execute_next_turn(self):
         if self.chess.state.game_ended is False:
             self.ai.execute_turn(self.chess.state.whites_turn, self.chess.board.board, self)
@@ -6,6 +6,7 @@ from ..environment import Environment
 def keyboard_events(event, env: Environment):
     #Go back in time
     if event.key == pygame.K_LEFT:
+        env.ai.cancel_search()
         env.ai.paused = True
         prev_state = env.chess.history.get_previous()
         env.chess.load_from_history(prev_state)
@@ -13,6 +14,7 @@ def keyboard_events(event, env: Environment):
 
     #Go forward in time
     if event.key == pygame.K_RIGHT:
+        env.ai.cancel_search()
         env.ai.paused = True
         next_state = env.chess.history.get_next()
         env.chess.load_from_history(next_state)
@@ -54,6 +54,12 @@ def draw_game_stats(surface: Surface, env: Environment):
     surface.blit(lm_text, lm_pos)
     surface.blit(check_text, check_pos)  
 
+    #AI Thinking
+    if env.ai.is_thinking() or env.ai.is_pondering():
+        thinking_text = rf_font.render("AI: Thinking..." if env.ai.is_thinking() else "AI: Pondering...", True, env.visual.colors['WHITE'], env.visual.colors['BLACK'])
+        thinking_pos = (x, y + fontsize * 6)
+        surface.blit(thinking_text, thinking_pos)
+
 def draw_score_text(surface: Surface, xo: int, yo: int, score: int, size: int, env: Environment):
     fontsize = int(env.visual.fontsize_title * env.visual.zoom / 2) 
     rf_font = font.Font('freesansbold.ttf', fontsize)
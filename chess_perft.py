@@ -0,0 +1,41 @@
+"""
+
+    Perft runner for move generation
+
+        python chess_perft.py                      Run the standard positions to depth 3
+        python chess_perft.py --depth 4            Run the standard positions to depth 4
+        python chess_perft.py --fen "<FEN>" -d 3   Divide a single position
+        python chess_perft.py --playouts 100       Check incremental keys and evaluation over random playouts
+
+"""
+
+import argparse
+import sys
+
+from chess_ai.chess_logic.global_chess import GlobalChess
+from chess_ai.chess_logic.chess_perft import run_perft_suite, run_divide, run_playouts
+
+#Constants
+CONFIG_FILE = "./chess_config.yaml"
+
+parser = argparse.ArgumentParser(description="Count move generation nodes (perft) for standard chess positions.")
+parser.add_argument("-d", "--depth", type=int, default=3, help="Maximum depth to search.")
+parser.add_argument("-f", "--fen", type=str, default=None, help="Divide a single FEN position instead of running the standard positions.")
+parser.add_argument("-b", "--backend", type=str, default=None, help="Board backend to generate moves with (LIST or BITBOARD, BITBOARD cross-checks LIST and is not faster).")
+parser.add_argument("-p", "--playouts", type=int, default=0, help="Random playouts per position to check incremental keys and evaluation against a recomputation, instead of perft.")
+parser.add_argument("--plies", type=int, default=80, help="Maximum moves per random playout.")
+parser.add_argument("--seed", type=int, default=0, help="Random seed of the playouts.")
+parser.add_argument("-c", "--config", type=str, default=CONFIG_FILE, help="Chess config file.")
+args = parser.parse_args()
+
+chess = GlobalChess().set_from_yaml(args.config)
+if args.backend is not None:
+    chess.board.backend = args.backend
+
+if args.fen is not None:
+    run_divide(chess, args.fen, args.depth)
+elif args.playouts > 0:
+    if run_playouts(chess, args.playouts, args.plies, args.seed) is False:
+        sys.exit(1)
+elif run_perft_suite(chess, args.depth) is False:
+    sys.exit(1)
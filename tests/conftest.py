@@ -0,0 +1,16 @@
+"""
+
+    Shared fixtures, a GlobalChess set up from the repository's chess_config.yaml
+
+"""
+import os
+
+import pytest
+
+from chess_ai.chess_logic.global_chess import GlobalChess
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "chess_config.yaml")
+
+@pytest.fixture
+def chess() -> GlobalChess:
+    return GlobalChess().set_from_yaml(CONFIG_FILE)
@@ -0,0 +1,58 @@
+"""
+
+    Static exchange evaluation and MVV-LVA ordering of captures
+
+"""
+import pytest
+
+def get_move(chess, fen: str, move_str: str) -> tuple:
+    """Looks up a legal move of a FEN position.
+
+        Returns: tuple[ board, move code ]
+    """
+    position = chess.get_position_from_fen(fen)
+    move = chess.codes.from_str(move_str, position.board)
+    assert move in chess.moves.get_valid_position_moves(position)
+    return position.board, move
+
+def get_value(chess, board: list, square_str: str) -> int:
+    move = chess.codes.from_str(square_str + square_str, board)
+    return chess.score.get_score_table()['values_king'][board[move & 0xFF]]
+
+def test_queen_takes_defended_pawn_is_losing(chess):
+    board, move = get_move(chess, "4k3/8/4p3/3p4/8/8/8/3QK3 w - - 0 1", "d1d5")
+    assert chess.exchange.calc_see(board, move) == get_value(chess, board, "d5") - get_value(chess, board, "d1")
+    assert chess.exchange.calc_see(board, move) < 0
+    assert chess.exchange.is_losing_capture(board, move)
+
+def test_undefended_capture_wins_victim(chess):
+    board, move = get_move(chess, "4k3/8/8/3n4/8/8/8/3RK3 w - - 0 1", "d1d5")
+    assert chess.exchange.calc_see(board, move) == get_value(chess, board, "d5")
+    assert not chess.exchange.is_losing_capture(board, move)
+
+def test_even_trade_is_not_losing(chess):
+    board, move = get_move(chess, "4k3/8/4p3/3n4/8/4N3/8/4K3 w - - 0 1", "e3d5")
+    assert chess.exchange.calc_see(board, move) == 0
+    assert not chess.exchange.is_losing_capture(board, move)
+
+def test_xray_recapture_is_counted(chess):
+    #Rxd5 Rxd5 Rxd5, the second white rook joins once the first one has moved
+    board, move = get_move(chess, "3rk3/8/8/3p4/8/8/3R4/3RK3 w - - 0 1", "d2d5")
+    assert chess.exchange.calc_see(board, move) == get_value(chess, board, "d5")
+    assert not chess.exchange.is_losing_capture(board, move)
+
+@pytest.mark.parametrize("fen, move_str", [
+    ("4k3/8/4p3/3q4/4P3/8/8/4K3 w - - 0 1", "e4d5"),
+    ("4k3/8/4p3/3b4/4P3/8/8/4K3 w - - 0 1", "e4d5"),
+    ("4k3/8/4p3/3r4/8/4N3/8/4K3 w - - 0 1", "e3d5"),
+])
+def test_cheaper_attacker_is_never_losing(chess, fen, move_str):
+    position = chess.get_position_from_fen(fen)
+    move = chess.codes.from_str(move_str, position.board)
+    assert not chess.exchange.is_losing_capture(position.board, move)
+
+def test_mvv_lva_orders_pawn_takes_queen_first(chess):
+    fen = "4k3/8/8/3q3p/4P3/8/8/4K2Q w - - 0 1"
+    board, pawn_takes_queen = get_move(chess, fen, "e4d5")
+    board, queen_takes_pawn = get_move(chess, fen, "h1h5")
+    assert chess.exchange.calc_mvv_lva(board, pawn_takes_queen) > chess.exchange.calc_mvv_lva(board, queen_takes_pawn)
@@ -0,0 +1,44 @@
+"""
+
+    Move code packing: positions, promotion and flags survive encode / decode
+
+"""
+import pytest
+
+from chess_ai.chess_logic.chess_move_codes import (MOVE_SQUARE_MASK, MOVE_TO_SHIFT, MOVE_PROMOTION_SHIFT, MOVE_PROMOTION_MASK,
+                                                   MOVE_CAPTURE, MOVE_EN_PASSANT, MOVE_CASTLE)
+
+FLAGS = [0, MOVE_CAPTURE, MOVE_CAPTURE | MOVE_EN_PASSANT, MOVE_CASTLE]
+
+@pytest.mark.parametrize("flags", FLAGS)
+@pytest.mark.parametrize("promotion", ["", "Q", "R", "B", "N"])
+def test_encode_decode_round_trip(chess, flags, promotion):
+    for square_old in range(chess.board.ranks * chess.board.files):
+        for square_new in (0, 7, 27, 63, square_old):
+            rank_i_old, file_i_old = divmod(square_old, chess.board.files)
+            rank_i_new, file_i_new = divmod(square_new, chess.board.files)
+            move = chess.codes.encode(rank_i_old, file_i_old, rank_i_new, file_i_new, promotion, flags)
+            assert chess.codes.decode(move) == (rank_i_old, file_i_old, rank_i_new, file_i_new)
+            assert chess.codes.get_promotion_str(move) == promotion
+            assert move & (MOVE_CAPTURE | MOVE_EN_PASSANT | MOVE_CASTLE) == flags
+
+def test_fields_do_not_overlap(chess):
+    move = chess.codes.encode(7, 7, 0, 0, "N", MOVE_CAPTURE | MOVE_EN_PASSANT | MOVE_CASTLE)
+    assert move & MOVE_SQUARE_MASK == 63
+    assert (move >> MOVE_TO_SHIFT) & MOVE_SQUARE_MASK == 0
+    assert (move >> MOVE_PROMOTION_SHIFT) & MOVE_PROMOTION_MASK == chess.board.piece_numbers['KNIGHT']
+
+@pytest.mark.parametrize("fen, move_str, flags", [
+    ("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1", "e2e4", 0),
+    ("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1", "e1g1", MOVE_CASTLE),
+    ("r3k2r/8/8/8/8/8/8/R3K2R b KQkq - 0 1", "e8c8", MOVE_CASTLE),
+    ("8/8/8/3pP3/8/8/8/4K2k w - d6 0 1", "e5d6", MOVE_CAPTURE | MOVE_EN_PASSANT),
+    ("3r3k/4P3/8/8/8/8/8/4K3 w - - 0 1", "e7d8n", MOVE_CAPTURE),
+    ("7k/4P3/8/8/8/8/8/4K3 w - - 0 1", "e7e8q", 0),
+])
+def test_from_str_sets_flags_from_board(chess, fen, move_str, flags):
+    position = chess.get_position_from_fen(fen)
+    move = chess.codes.from_str(move_str, position.board)
+    assert move & (MOVE_CAPTURE | MOVE_EN_PASSANT | MOVE_CASTLE) == flags
+    assert chess.codes.to_str(move) == move_str
+    assert move in chess.moves.get_valid_position_moves(position)
@@ -0,0 +1,88 @@
+"""
+
+    Shared transposition table: entries seen across attached tables and processes, same replacement policy, freeing the block
+
+"""
+import multiprocessing
+from multiprocessing import shared_memory
+
+import pytest
+
+from chess_ai.ai.shared_transposition_table import SharedTranspositionTable
+from chess_ai.ai.transposition_table import TT_EXACT, TT_LOWER
+
+@pytest.fixture
+def tables():
+    owner = SharedTranspositionTable(0.01)
+    attached = SharedTranspositionTable(0.01, owner.name)
+    yield owner, attached
+    attached.close()
+    owner.close()
+
+def get_bucket_keys(tt: SharedTranspositionTable, count: int, start: int = 5) -> list:
+    """Keys that all land in the same bucket.
+
+        Returns: list of Zobrist keys
+    """
+    return [start + index * (tt.bucket_mask + 1) for index in range(count)]
+
+def store_in_process(name: str, key: int) -> None:
+    tt = SharedTranspositionTable(0.01, name)
+    tt.store(key, 4, 2.5, TT_LOWER, 77)
+    tt.close()
+
+def test_attached_table_sees_owner_entries(tables):
+    owner, attached = tables
+    assert not attached.owner
+    assert attached.get_slot_count() == owner.get_slot_count()
+    owner.store(0xDEADBEEF, 7, -123.5, TT_EXACT, 0x12345)
+    assert attached.probe(0xDEADBEEF) == (7, -123.5, TT_EXACT, 0x12345)
+    attached.store(0xDEADBEEF, 8, 1.0, TT_LOWER, 1)
+    assert owner.probe(0xDEADBEEF) == (8, 1.0, TT_LOWER, 1)
+
+def test_entry_stored_by_another_process(tables):
+    owner, _ = tables
+    process = multiprocessing.get_context("spawn").Process(target=store_in_process, args=(owner.name, 0xC0FFEE))
+    process.start()
+    process.join(30)
+    assert process.exitcode == 0
+    assert owner.probe(0xC0FFEE) == (4, 2.5, TT_LOWER, 77)
+
+def test_replacement_policy_matches_transposition_table(tables):
+    owner, attached = tables
+    deep_key, shallow_key, other_key = get_bucket_keys(owner, 3)
+    owner.store(deep_key, 6, 1.0, TT_EXACT, 1)
+    attached.store(shallow_key, 2, 2.0, TT_EXACT, 2)
+    assert owner.probe(deep_key) == (6, 1.0, TT_EXACT, 1)
+    assert owner.probe(shallow_key) == (2, 2.0, TT_EXACT, 2)
+
+    #An older deep entry gives way to a shallower one of the new search
+    owner.new_search()
+    owner.store(other_key, 1, 3.0, TT_EXACT, 3)
+    assert owner.probe(deep_key) is None
+    assert owner.probe(other_key) == (1, 3.0, TT_EXACT, 3)
+    assert owner.probe(shallow_key) == (2, 2.0, TT_EXACT, 2)
+
+def test_torn_slot_reads_as_miss(tables):
+    owner, attached = tables
+    key, = get_bucket_keys(owner, 1)
+    owner.store(key, 3, 1.0, TT_EXACT, 9)
+    index = ((key & owner.bucket_mask) << 1) * 3
+    owner.doubles[index + 1] = 2.0
+    assert attached.probe(key) is None
+
+def test_clear_empties_every_attached_table(tables):
+    owner, attached = tables
+    owner.store(0xDEADBEEF, 1, 0.0, TT_EXACT, 0)
+    attached.clear()
+    assert owner.probe(0xDEADBEEF) is None
+
+def test_owner_close_frees_block():
+    owner = SharedTranspositionTable(0.01)
+    attached = SharedTranspositionTable(0.01, owner.name)
+    name = owner.name
+    attached.close()
+    shared_memory.SharedMemory(name=name).close()
+    owner.close()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
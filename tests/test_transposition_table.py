@@ -0,0 +1,89 @@
+"""
+
+    Transposition table: probe / store, the two slot replacement policy and aging
+
+"""
+from chess_ai.ai.transposition_table import TranspositionTable, TT_EXACT, TT_LOWER, TT_UPPER, get_bucket_count
+
+def get_bucket_keys(tt: TranspositionTable, count: int, start: int = 5) -> list:
+    """Keys that all land in the same bucket.
+
+        Returns: list of Zobrist keys
+    """
+    return [start + index * (tt.bucket_mask + 1) for index in range(count)]
+
+def test_bucket_count_is_power_of_two():
+    for size_mb in (0.01, 1, 16):
+        bucket_count = get_bucket_count(size_mb)
+        assert bucket_count & (bucket_count - 1) == 0
+        assert bucket_count * 2 * 24 <= size_mb * 1024 * 1024 < bucket_count * 2 * 2 * 24
+
+def test_store_probe_round_trip():
+    tt = TranspositionTable(0.01)
+    tt.store(0xDEADBEEF, 7, -123.5, TT_UPPER, 0x12345)
+    assert tt.probe(0xDEADBEEF) == (7, -123.5, TT_UPPER, 0x12345)
+    assert tt.probe(0xDEADBEF0) is None
+    assert tt.get_stats()["hits"] == 1
+    assert tt.get_stats()["misses"] == 1
+
+def test_same_key_is_overwritten():
+    tt = TranspositionTable(0.01)
+    key, = get_bucket_keys(tt, 1)
+    tt.store(key, 6, 1.0, TT_EXACT, 1)
+    tt.store(key, 2, 2.0, TT_LOWER, 2)
+    assert tt.probe(key) == (2, 2.0, TT_LOWER, 2)
+
+def test_shallower_store_keeps_deep_entry_in_same_search():
+    tt = TranspositionTable(0.01)
+    deep_key, shallow_key, other_key = get_bucket_keys(tt, 3)
+    tt.store(deep_key, 6, 1.0, TT_EXACT, 1)
+    tt.store(shallow_key, 2, 2.0, TT_EXACT, 2)
+    assert tt.probe(deep_key) == (6, 1.0, TT_EXACT, 1)
+    assert tt.probe(shallow_key) == (2, 2.0, TT_EXACT, 2)
+
+    #The always replace slot takes the next shallow entry, the deep one stays
+    tt.store(other_key, 3, 3.0, TT_EXACT, 3)
+    assert tt.probe(shallow_key) is None
+    assert tt.probe(other_key) == (3, 3.0, TT_EXACT, 3)
+    assert tt.probe(deep_key) is not None
+
+def test_deeper_store_takes_depth_preferred_slot():
+    tt = TranspositionTable(0.01)
+    shallow_key, deep_key = get_bucket_keys(tt, 2)
+    tt.store(shallow_key, 2, 1.0, TT_EXACT, 1)
+    tt.store(deep_key, 6, 2.0, TT_EXACT, 2)
+    assert tt.keys[(deep_key & tt.bucket_mask) << 1] == deep_key
+
+def test_new_search_lets_old_deep_entry_be_replaced():
+    tt = TranspositionTable(0.01)
+    deep_key, shallow_key = get_bucket_keys(tt, 2)
+    tt.store(deep_key, 6, 1.0, TT_EXACT, 1)
+    tt.new_search()
+    tt.store(shallow_key, 2, 2.0, TT_EXACT, 2)
+    assert tt.keys[(shallow_key & tt.bucket_mask) << 1] == shallow_key
+    assert tt.probe(deep_key) is None
+
+def test_age_wraps():
+    tt = TranspositionTable(0.01)
+    for _ in range(256):
+        tt.new_search()
+    assert tt.age == 0
+
+def test_collision_is_counted():
+    tt = TranspositionTable(0.01)
+    stored_key, missing_key = get_bucket_keys(tt, 2)
+    tt.store(stored_key, 1, 0.0, TT_EXACT, 0)
+    assert tt.probe(missing_key) is None
+    assert tt.get_stats()["collisions"] == 1
+
+    #A miss on an empty bucket is not a collision
+    assert tt.probe(stored_key + 1) is None
+    assert tt.get_stats()["collisions"] == 1
+
+def test_clear():
+    tt = TranspositionTable(0.01)
+    key, = get_bucket_keys(tt, 1)
+    tt.store(key, 1, 0.0, TT_EXACT, 0).new_search()
+    tt.clear()
+    assert tt.probe(key) is None
+    assert tt.age == 0